@@ -1,10 +1,30 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
 
 from .models import Item
+from .search import search_items
 
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "created_at")
+    list_display = ("id", "name", "created_at", "updated_at")
+    # поиск — get_search_results ниже; search_fields нужен, чтобы admin показал поле поиска
     search_fields = ("name",)
     ordering = ("-created_at",)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Вместо ILIKE '%q%' (seq scan): full-text + pg_trgm по GIN-индексам (apps/core/search.py),
+        результаты по релевантности. Точное совпадение external_id — сразу по unique-индексу.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        exact = queryset.filter(external_id=search_term)
+        if exact.exists():
+            return exact, False
+        found = search_items(queryset, search_term)
+        if ORDER_VAR in request.GET:
+            # пользователь выбрал сортировку по колонке — она важнее релевантности
+            found = found.order_by(*queryset.query.order_by)
+        return found, False
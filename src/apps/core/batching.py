@@ -0,0 +1,164 @@
+# src/apps/core/batching.py
+"""
+Пакетные Celery-задачи: одно сообщение брокеру и один вызов задачи на пачку элементов,
+а не на каждый мелкий job. Продюсер копит элементы в буфере процесса и отправляет пачку,
+когда набралось size элементов или самому старому исполнилось interval секунд.
+
+    @shared_task(base=BatchTask, batch_size=1000)
+    def reindex_items(item_ids: list[int]): ...
+
+    reindex_items.push(item.id)            # общий буфер процесса (таймер + atexit)
+    with reindex_items.buffer() as batch:  # свой буфер, flush на выходе из with
+        batch.extend(ids)
+
+Элементы уходят в брокер сразу при flush — внутри transaction.atomic() пушьте из on_commit.
+Результаты пакетных задач не хранятся (CELERY_TASK_IGNORE_RESULT); нужен результат —
+ignore_result=False у конкретной задачи.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Iterable
+
+from celery import Task
+from django.conf import settings
+
+log = logging.getLogger("logger")
+
+_buffers: "weakref.WeakSet[BatchBuffer]" = weakref.WeakSet()
+
+
+class BatchBuffer:
+    """ Потокобезопасный буфер элементов одной задачи; flush по размеру, по времени и при выходе """
+
+    def __init__(self, task: Task, size: int | None = None, interval: float | None = None):
+        self.task = task
+        self.size = size or settings.BATCH_TASK_SIZE
+        self.interval = settings.BATCH_TASK_INTERVAL if interval is None else interval
+        self._items: list = []
+        self._first_at = 0.0
+        self._cond = threading.Condition()
+        self._thread_pid = None
+        self._closed = False
+        _buffers.add(self)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __enter__(self) -> "BatchBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def add(self, item: Any) -> None:
+        with self._cond:
+            if not self._items:
+                self._first_at = time.monotonic()
+                self._ensure_timer()
+                self._cond.notify()
+            self._items.append(item)
+            if len(self._items) < self.size:
+                return
+            items = self._take()
+        self._send(items)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.add(item)
+
+    def flush(self) -> int:
+        """ Отправляет накопленное; возвращает число элементов """
+        with self._cond:
+            items = self._take()
+        if items:
+            self._send(items)
+        return len(items)
+
+    def close(self) -> None:
+        """ flush и остановка таймера; дальше буфер можно только выбросить """
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        _buffers.discard(self)
+
+    def _take(self) -> list:
+        items, self._items = self._items, []
+        return items
+
+    def _send(self, items: list) -> None:
+        self.task.apply_async(args=(items,))
+
+    def _ensure_timer(self) -> None:
+        # поток — на процесс: после fork (prefork Celery, gunicorn) родительского потока в дочернем нет
+        if self.interval <= 0 or self._thread_pid == os.getpid():
+            return
+        self._thread_pid = os.getpid()
+        threading.Thread(target=self._flush_on_timer, name=f"batch-{self.task.name}", daemon=True).start()
+
+    def _flush_on_timer(self) -> None:
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._first_at + self.interval - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                items = self._take()
+            try:
+                self._send(items)
+            except Exception as e:
+                log.warning("Failed to flush %d items of %s: %s", len(items), self.task.name, e)
+
+
+class BatchTask(Task):
+    """
+    База пакетных задач: run(items: list). batch_size / batch_interval — параметры буфера
+    (по умолчанию BATCH_TASK_SIZE / BATCH_TASK_INTERVAL из настроек).
+    """
+    batch_size: int | None = None
+    batch_interval: float | None = None
+    _shared_buffer: BatchBuffer | None = None
+    _shared_lock = threading.Lock()
+
+    def buffer(self, size: int | None = None, interval: float | None = None) -> BatchBuffer:
+        """ Отдельный буфер (например, на время импорта): with task.buffer() as batch: ... """
+        return BatchBuffer(self, size or self.batch_size, self.batch_interval if interval is None else interval)
+
+    def push(self, item: Any) -> None:
+        """ Элемент в общий буфер процесса """
+        if self._shared_buffer is None:
+            with self._shared_lock:
+                if self._shared_buffer is None:
+                    self._shared_buffer = self.buffer()
+        self._shared_buffer.add(item)
+
+    def flush(self) -> int:
+        return self._shared_buffer.flush() if self._shared_buffer is not None else 0
+
+
+def _reset_after_fork() -> None:
+    # накопленное в родителе отправит родитель; ребёнку — пустые буферы и свежие блокировки
+    for buffer in list(_buffers):
+        buffer._items = []
+        buffer._cond = threading.Condition()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@atexit.register
+def flush_all_buffers() -> None:
+    """ Дослать хвосты всех буферов процесса (выход воркера, management-команды) """
+    for buffer in list(_buffers):
+        try:
+            buffer.flush()
+        except Exception as e:
+            log.warning("Failed to flush batch buffer of %s: %s", buffer.task.name, e)
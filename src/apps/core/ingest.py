@@ -0,0 +1,356 @@
+# src/apps/core/ingest.py
+"""
+Массовая загрузка items из фидов поставщиков (NDJSON / CSV).
+Строки фида -> временные staging-таблицы через COPY -> set-wise SQL в той же транзакции:
+справочники (supplier / category / tag) по имени, upsert core_item по external_id,
+M2M (core_item_categories, core_item_tag с weight) заменяются на те, что пришли в фиде.
+Парсинг и SQL общие: FastAPI заливает staging через asyncpg (copy_records_to_table),
+Celery — через psycopg2 (COPY FROM STDIN).
+Каждая строка фида проверяется моделью FeedRow (типы и длины колонок) до COPY.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import Annotated, Optional
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError
+
+from .models import Category, Item, ItemTag, Supplier, Tag
+
+# Колонки CSV — те же, что у /demo/items/export, только вместо id — external_id
+CSV_COLUMNS = ("external_id", "name", "supplier", "categories", "tags")
+
+# staging-таблица -> колонки (порядок = порядок значений в записях IngestBatch)
+STAGE_TABLES = {
+    "ingest_item": ("external_id", "name", "supplier"),
+    "ingest_item_category": ("external_id", "title"),
+    "ingest_item_tag": ("external_id", "title", "weight"),
+}
+
+# Таблицы, которые меняет загрузка, — для инвалидации кэша FastAPI
+TOUCHED_TABLES = {
+    Item._meta.db_table,
+    Supplier._meta.db_table,
+    Category._meta.db_table,
+    Tag._meta.db_table,
+    ItemTag._meta.db_table,
+    Item._meta.get_field("categories").m2m_db_table(),
+}
+
+# Загрузки сериализуются: справочники создаются по NOT EXISTS, параллельный фид создал бы дубли
+LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('core.ingest'))"
+
+CREATE_STAGE_SQL = """
+CREATE TEMP TABLE ingest_item (
+    external_id text NOT NULL, name text NOT NULL, supplier text
+) ON COMMIT DROP;
+CREATE TEMP TABLE ingest_item_category (external_id text NOT NULL, title text NOT NULL) ON COMMIT DROP;
+CREATE TEMP TABLE ingest_item_tag (
+    external_id text NOT NULL, title text NOT NULL, weight integer NOT NULL
+) ON COMMIT DROP;
+"""
+
+# Шаги после COPY. Каждый возвращает одну строку со счётчиками — они попадают в результат загрузки.
+APPLY_SQL = (
+    # hash join / DISTINCT по сотням тысяч строк — в памяти, а не батчами на диск
+    "SET LOCAL work_mem = '64MB'",
+    # статистика по temp-таблицам: без неё планировщик считает их пустыми
+    "ANALYZE ingest_item, ingest_item_category, ingest_item_tag",
+    """
+    WITH ins AS (
+        INSERT INTO core_supplier (name, created_at)
+        SELECT DISTINCT s.supplier, now() FROM ingest_item s
+        WHERE s.supplier IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM core_supplier x WHERE x.name = s.supplier)
+        RETURNING 1
+    ) SELECT count(*) AS suppliers_created FROM ins
+    """,
+    """
+    WITH ins AS (
+        INSERT INTO core_category (title)
+        SELECT DISTINCT s.title FROM ingest_item_category s
+        WHERE NOT EXISTS (SELECT 1 FROM core_category x WHERE x.title = s.title)
+        RETURNING 1
+    ) SELECT count(*) AS categories_created FROM ins
+    """,
+    """
+    WITH ins AS (
+        INSERT INTO core_tag (title)
+        SELECT DISTINCT s.title FROM ingest_item_tag s
+        WHERE NOT EXISTS (SELECT 1 FROM core_tag x WHERE x.title = s.title)
+        RETURNING 1
+    ) SELECT count(*) AS tags_created FROM ins
+    """,
+    # Повтор external_id внутри фида: берётся первая строка.
+    # Неизменившиеся строки не трогаем (WHERE ... IS DISTINCT FROM) — updated_at не двигается.
+    """
+    WITH src AS (
+        SELECT DISTINCT ON (s.external_id) s.external_id, s.name, sup.id AS supplier_id
+        FROM ingest_item s
+        LEFT JOIN (SELECT name, min(id) AS id FROM core_supplier GROUP BY name) sup
+               ON sup.name = s.supplier
+        ORDER BY s.external_id
+    ), up AS (
+        INSERT INTO core_item (external_id, name, supplier_id, created_at, updated_at)
+        SELECT external_id, name, supplier_id, now(), now() FROM src
+        ON CONFLICT (external_id) DO UPDATE
+            SET name = EXCLUDED.name, supplier_id = EXCLUDED.supplier_id, updated_at = EXCLUDED.updated_at
+            WHERE (core_item.name, core_item.supplier_id)
+                  IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.supplier_id)
+        RETURNING (xmax = 0) AS inserted
+    ) SELECT count(*) FILTER (WHERE inserted) AS items_created,
+             count(*) FILTER (WHERE NOT inserted) AS items_updated
+      FROM up
+    """,
+    """
+    CREATE TEMP TABLE ingest_item_ids ON COMMIT DROP AS
+    SELECT i.id, i.external_id
+    FROM core_item i JOIN (SELECT DISTINCT external_id FROM ingest_item) s USING (external_id)
+    """,
+    "ANALYZE ingest_item_ids",
+    # M2M items из фида = ровно то, что пришло в фиде: лишние связи удаляются, новые добавляются
+    """
+    WITH wanted AS (
+        SELECT DISTINCT ids.id AS item_id, c.id AS category_id
+        FROM ingest_item_category s
+        JOIN ingest_item_ids ids USING (external_id)
+        JOIN (SELECT title, min(id) AS id FROM core_category GROUP BY title) c ON c.title = s.title
+    ), del AS (
+        DELETE FROM core_item_categories ic USING ingest_item_ids ids
+        WHERE ic.item_id = ids.id
+          AND NOT EXISTS (
+              SELECT 1 FROM wanted w WHERE w.item_id = ic.item_id AND w.category_id = ic.category_id
+          )
+        RETURNING 1
+    ), ins AS (
+        INSERT INTO core_item_categories (item_id, category_id)
+        SELECT w.item_id, w.category_id FROM wanted w
+        WHERE NOT EXISTS (
+            SELECT 1 FROM core_item_categories ic WHERE ic.item_id = w.item_id AND ic.category_id = w.category_id
+        )
+        ORDER BY w.item_id, w.category_id
+        RETURNING 1
+    ) SELECT (SELECT count(*) FROM ins) AS categories_linked,
+             (SELECT count(*) FROM del) AS categories_unlinked
+    """,
+    # повтор тега у item'а в фиде: берётся первая строка (ON CONFLICT не может обновить строку дважды)
+    """
+    WITH wanted AS (
+        SELECT DISTINCT ON (ids.id, t.id) ids.id AS item_id, t.id AS tag_id, s.weight
+        FROM ingest_item_tag s
+        JOIN ingest_item_ids ids USING (external_id)
+        JOIN (SELECT title, min(id) AS id FROM core_tag GROUP BY title) t ON t.title = s.title
+        ORDER BY ids.id, t.id
+    ), del AS (
+        DELETE FROM core_item_tag it USING ingest_item_ids ids
+        WHERE it.item_id = ids.id
+          AND NOT EXISTS (SELECT 1 FROM wanted w WHERE w.item_id = it.item_id AND w.tag_id = it.tag_id)
+        RETURNING 1
+    ), upd AS (
+        UPDATE core_item_tag it SET weight = w.weight
+        FROM wanted w
+        WHERE it.item_id = w.item_id AND it.tag_id = w.tag_id AND it.weight <> w.weight
+        RETURNING 1
+    ), ins AS (
+        INSERT INTO core_item_tag (item_id, tag_id, weight)
+        SELECT w.item_id, w.tag_id, w.weight FROM wanted w
+        WHERE NOT EXISTS (SELECT 1 FROM core_item_tag it WHERE it.item_id = w.item_id AND it.tag_id = w.tag_id)
+        ORDER BY w.item_id, w.tag_id
+        RETURNING 1
+    ) SELECT (SELECT count(*) FROM ins) AS tags_linked,
+             (SELECT count(*) FROM del) AS tags_unlinked,
+             (SELECT count(*) FROM upd) AS tags_reweighted
+    """,
+)
+
+
+class IngestError(ValueError):
+    """ Некорректная строка фида (номер строки — в тексте ошибки) """
+
+
+def _text(model, name: str):
+    # только строки (без приведения чисел) и не длиннее колонки: иначе COPY падает уже в БД
+    return Annotated[str, Field(min_length=1, max_length=model._meta.get_field(name).max_length)]
+
+
+ExternalId = _text(Item, "external_id")
+ItemName = _text(Item, "name")
+SupplierName = _text(Supplier, "name")
+CategoryTitle = _text(Category, "title")
+TagTitle = _text(Tag, "title")
+TagWeight = Annotated[int, Field(ge=-2**31, le=2**31 - 1)]
+
+
+class FeedRow(BaseModel):
+    """ Строка фида после разбора формата (NDJSON / CSV) """
+    external_id: ExternalId
+    name: ItemName
+    supplier: Optional[SupplierName] = None
+    categories: list[CategoryTitle] = []
+    tags: list[tuple[TagTitle, TagWeight]] = []
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors(include_url=False)
+    )
+
+
+@dataclass
+class IngestBatch:
+    """ Записи для COPY в staging-таблицы (см. STAGE_TABLES) """
+    items: list[tuple] = field(default_factory=list)
+    categories: list[tuple] = field(default_factory=list)
+    tags: list[tuple] = field(default_factory=list)
+
+    def records(self) -> dict[str, list[tuple]]:
+        return {
+            "ingest_item": self.items,
+            "ingest_item_category": self.categories,
+            "ingest_item_tag": self.tags,
+        }
+
+    def add(self, line: int, external_id, name, supplier, categories, tags) -> None:
+        external_id = str(external_id).strip() if external_id is not None else ""
+        if not external_id or not name:
+            raise IngestError(f"line {line}: external_id and name are required")
+        try:
+            row = FeedRow(
+                external_id=external_id, name=name, supplier=supplier or None, categories=categories, tags=tags,
+            )
+        except ValidationError as e:
+            raise IngestError(f"line {line}: {_validation_message(e)}")
+        self.items.append((row.external_id, row.name, row.supplier))
+        for title in row.categories:
+            self.categories.append((row.external_id, title))
+        for title, weight in row.tags:
+            self.tags.append((row.external_id, title, weight))
+
+
+def _weight(line: int, value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        raise IngestError(f"line {line}: bad tag weight {value!r}")
+
+
+def _json_categories(values) -> list:
+    # ["a", "b"] или как в экспорте: [{"id": .., "title": "a"}, ...]; типы проверяет FeedRow
+    return [v["title"] if isinstance(v, dict) else v for v in values or ()]
+
+
+def _json_tags(line: int, values) -> list[tuple]:
+    # [{"title": "t", "weight": 1}, ...] (формат экспорта) или ["t:1", ...]
+    tags = []
+    for v in values or ():
+        if isinstance(v, dict):
+            tags.append((v["title"], _weight(line, v.get("weight"))))
+        elif isinstance(v, str):
+            title, _, weight = v.rpartition(":")
+            tags.append((title, _weight(line, weight)) if title else (v, 0))
+        else:
+            tags.append((v, 0))
+    return tags
+
+
+def parse_ndjson(data: bytes) -> IngestBatch:
+    """ Строка = {"external_id", "name", "supplier", "categories": [...], "tags": [...]} """
+    batch = IngestBatch()
+    for line, raw in enumerate(data.splitlines(), start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = orjson.loads(raw)
+            batch.add(
+                line,
+                row.get("external_id"),
+                row.get("name"),
+                row.get("supplier"),
+                _json_categories(row.get("categories")),
+                _json_tags(line, row.get("tags")),
+            )
+        except IngestError:
+            raise
+        except (orjson.JSONDecodeError, AttributeError, KeyError, TypeError) as e:
+            raise IngestError(f"line {line}: {e}")
+    return batch
+
+
+def parse_csv(text: str) -> IngestBatch:
+    """ Заголовок обязателен (CSV_COLUMNS); categories "a|b", tags "title:weight|..." """
+    batch = IngestBatch()
+    reader = csv.DictReader(io.StringIO(text))
+    missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise IngestError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+    for row in reader:
+        line = reader.line_num
+        tags = []
+        for v in (row["tags"] or "").split("|"):
+            if v:
+                title, _, weight = v.rpartition(":")
+                tags.append((title, _weight(line, weight)) if title else (v, 0))
+        batch.add(
+            line,
+            row["external_id"],
+            row["name"],
+            row["supplier"],
+            [v for v in (row["categories"] or "").split("|") if v],
+            tags,
+        )
+    return batch
+
+
+def parse(data: bytes, fmt: str) -> IngestBatch:
+    if fmt == "csv":
+        return parse_csv(data.decode("utf-8-sig"))
+    return parse_ndjson(data)
+
+
+def copy_rows_csv(records: list[tuple]) -> io.StringIO:
+    """ Записи -> CSV для COPY ... FROM STDIN (FORMAT csv): None = NULL, пустая строка — "" """
+    buf = io.StringIO()
+    for record in records:
+        buf.write(",".join("" if v is None else _csv_field(v) for v in record))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def _csv_field(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def ingest(cursor, batch: IngestBatch) -> dict:
+    """
+    Синхронный вариант для Django/Celery: cursor — курсор psycopg2 внутри transaction.atomic().
+    """
+    cursor.execute(LOCK_SQL)
+    cursor.execute(CREATE_STAGE_SQL)
+    for table, records in batch.records().items():
+        columns = ", ".join(STAGE_TABLES[table])
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", copy_rows_csv(records))
+    result = {"rows": len(batch.items)}
+    for sql in APPLY_SQL:
+        cursor.execute(sql)
+        if cursor.description:
+            result.update(zip((c.name for c in cursor.description), cursor.fetchone()))
+    return result
+
+
+async def ingest_async(conn, batch: IngestBatch) -> dict:
+    """ Вариант для FastAPI: conn — asyncpg.Connection, транзакция открывается здесь """
+    async with conn.transaction():
+        await conn.execute(LOCK_SQL)
+        await conn.execute(CREATE_STAGE_SQL)
+        for table, records in batch.records().items():
+            await conn.copy_records_to_table(table, records=records, columns=STAGE_TABLES[table])
+        result = {"rows": len(batch.items)}
+        for sql in APPLY_SQL:
+            row = await conn.fetchrow(sql)
+            if row is not None:
+                result.update(row)
+    return result
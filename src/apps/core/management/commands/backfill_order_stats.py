@@ -0,0 +1,43 @@
+# src/apps/core/management/commands/backfill_order_stats.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from apps.core.models import UserOrderStats
+from apps.core.order_stats import iter_user_id_batches, recalc_order_stats
+from apps.core.signals import bump_cache_tags
+from apps.core.tasks import recalc_user_order_stats
+
+
+class Command(BaseCommand):
+    help = "Пересчитать core_user_order_stats по существующим заказам (пачками пользователей)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Пользователей на транзакцию")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--enqueue", action="store_true",
+            help="Не считать здесь, а отправить пачки в Celery (recalc_user_order_stats)",
+        )
+
+    def handle(self, *args, batch_size, database, enqueue, **options):
+        started = time.monotonic()
+        total = 0
+        if enqueue:
+            # одно сообщение на batch_size пользователей; пересчитают воркеры (база по умолчанию)
+            with recalc_user_order_stats.buffer(size=batch_size) as batch:
+                for user_ids in iter_user_id_batches(batch_size, using=database):
+                    batch.extend(user_ids)
+                    total += len(user_ids)
+            self.stdout.write(self.style.SUCCESS(f"Enqueued order stats recalc for {total} users"))
+            return
+        # каждая пачка — своя короткая транзакция: строки агрегатов блокируются ненадолго,
+        # создание заказов в FastAPI параллельно не останавливается
+        for user_ids in iter_user_id_batches(batch_size, using=database):
+            total += recalc_order_stats(user_ids, using=database)
+            self.stdout.write(f"... {total} users")
+        bump_cache_tags({UserOrderStats._meta.db_table})
+        self.stdout.write(self.style.SUCCESS(
+            f"Backfilled order stats for {total} users in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_item_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # существующие строки получили now() — считаем, что менялись в момент создания
+        migrations.RunSQL(
+            "UPDATE core_item SET updated_at = created_at",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['updated_at'], name='core_item_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_user_order_stats'),
+    ]
+
+    operations = [
+        # хранимая generated-колонка: ADD COLUMN переписывает core_item (ACCESS EXCLUSIVE на время миграции)
+        migrations.AddField(
+            model_name='item',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('name', config='simple'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        AddIndexConcurrently(
+            model_name='item',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='core_item_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:26
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import (AddIndexConcurrently,
+                                                TrigramExtension)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0007_item_search_vector'),
+    ]
+
+    operations = [
+        # CREATE EXTENSION pg_trgm: нужны права владельца БД (или суперпользователя)
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='item',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='core_item_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
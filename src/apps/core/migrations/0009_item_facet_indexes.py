@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:46
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_item_name_trgm'),
+    ]
+
+    operations = [
+        # сначала строим покрывающие индексы, потом снимаем одноколоночные FK-индексы,
+        # которые они заменяют (ведущая колонка та же)
+        AddIndexConcurrently(
+            model_name='item',
+            index=models.Index(fields=['supplier', 'created_at', 'id'], name='core_item_supplier_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='itemtag',
+            index=models.Index(fields=['tag', 'item'], name='core_item_tag_tag_item_idx'),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='supplier',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.supplier'),
+        ),
+        migrations.AlterField(
+            model_name='itemtag',
+            name='tag',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.tag'),
+        ),
+        # авто-M2M таблица не описывается моделью — её индекс только через SQL
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS core_item_categories_category_item_idx "
+                "ON core_item_categories (category_id, item_id);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS core_item_categories_category_item_idx;",
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:10
+
+from django.db import migrations
+
+# Каталожные агрегаты (apps/core/summary.py). Сначала агрегат по id, потом join со справочником:
+# значения без items тоже попадают в view (с нулём). refreshed_at — только в строке 'catalog',
+# чтобы REFRESH ... CONCURRENTLY без изменений данных переписывал одну строку, а не все.
+# WITH DATA: view заполняется сразу в миграции, роуты не ждут первого обновления beat
+# (view без данных роуты обходят живыми агрегатами — fastapi_app/routes/summary.py).
+CREATE_VIEW_SQL = """
+CREATE MATERIALIZED VIEW core_item_summary AS
+SELECT 'catalog'::text AS kind, 0::bigint AS value_id, NULL::text AS title,
+       (SELECT count(*) FROM core_item) AS items_count, NULL::bigint AS weight_total,
+       now() AS refreshed_at
+UNION ALL
+SELECT 'supplier', s.id, s.name, coalesce(a.items_count, 0), NULL, NULL
+FROM core_supplier s
+LEFT JOIN (SELECT supplier_id, count(*) AS items_count FROM core_item GROUP BY supplier_id) a
+    ON a.supplier_id = s.id
+UNION ALL
+SELECT 'category', c.id, c.title, coalesce(a.items_count, 0), NULL, NULL
+FROM core_category c
+LEFT JOIN (SELECT category_id, count(*) AS items_count FROM core_item_categories GROUP BY category_id) a
+    ON a.category_id = c.id
+UNION ALL
+SELECT 'tag', t.id, t.title, coalesce(a.items_count, 0), coalesce(a.weight_total, 0), NULL
+FROM core_tag t
+LEFT JOIN (SELECT tag_id, count(*) AS items_count, sum(weight) AS weight_total
+           FROM core_item_tag GROUP BY tag_id) a
+    ON a.tag_id = t.id
+WITH DATA;
+
+-- без уникального индекса REFRESH MATERIALIZED VIEW CONCURRENTLY невозможен
+CREATE UNIQUE INDEX core_item_summary_kind_value_uniq ON core_item_summary (kind, value_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_item_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=CREATE_VIEW_SQL,
+            reverse_sql="DROP MATERIALIZED VIEW IF EXISTS core_item_summary;",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:40
+
+from django.db import migrations
+
+# Результаты Celery (CELERY_RESULT_STORE=django-db) — временные данные: без WAL каждая запись
+# дешевле в разы и не уходит на реплики. После падения Postgres таблицы окажутся пустыми.
+# SET UNLOGGED переписывает таблицу под ACCESS EXCLUSIVE — на большой таблице сначала
+# удалите старые результаты: apps.core.task_results.prune_task_results().
+#
+# Миграция core меняет таблицы другого приложения (django_celery_results): их модели не
+# меняются, Django про UNLOGGED не знает — откат только через эту миграцию (reverse_sql).
+# Зависимость — на 0011 (есть во всех поддерживаемых django-celery-results>=2.5):
+# таблица groupresult появляется в 0009, а в новых версиях дальше идут только ALTER колонок.
+RESULT_TABLES = ("django_celery_results_taskresult", "django_celery_results_groupresult")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_item_summary'),
+        ('django_celery_results', '0011_taskresult_periodic_task_name'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[f"ALTER TABLE {table} SET UNLOGGED;" for table in RESULT_TABLES],
+            reverse_sql=[f"ALTER TABLE {table} SET LOGGED;" for table in RESULT_TABLES],
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
+from .search import SEARCH_CONFIG
+
 # DEMO
 
 User = get_user_model()
@@ -29,12 +33,40 @@ class Category(models.Model):
 
 class Item(models.Model):
     name = models.CharField(max_length=200)
-    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name="items", null=True)
+    # ключ товара во внешних фидах поставщиков (upsert при массовой загрузке, apps/core/ingest.py)
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+    # db_index=False: FK покрыт индексом core_item_supplier_created_idx (supplier, created_at, id)
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.CASCADE, related_name="items", null=True, db_index=False,
+    )
     categories = models.ManyToManyField(Category, related_name="items")  # авто-M2M таблица
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # поиск (apps/core/search.py): хранимый tsvector, Postgres пересчитывает его сам при записи name
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "core_item"
+        indexes = [
+            # keyset-пагинация в FastAPI: ORDER BY created_at DESC, id DESC
+            models.Index(fields=["created_at", "id"], name="core_item_created_id_idx"),
+            # фасеты: страница поставщика в том же порядке и счётчики по supplier (index-only)
+            models.Index(fields=["supplier", "created_at", "id"], name="core_item_supplier_created_idx"),
+            # conditional GET в FastAPI: max(updated_at) — по индексу, без скана таблицы
+            models.Index(fields=["updated_at"], name="core_item_updated_at_idx"),
+            # поиск: full-text по search_vector и pg_trgm по name (опечатки, ILIKE '%q%')
+            GinIndex(fields=["search_vector"], name="core_item_search_vector_idx"),
+            GinIndex(fields=["name"], name="core_item_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+        ]
+        constraints = [
+            # арбитр ON CONFLICT (external_id) при загрузке фидов; UniqueConstraint, а не unique=True —
+            # без лишнего varchar_pattern_ops-индекса (_like), который замедляет вставку
+            models.UniqueConstraint(fields=["external_id"], name="core_item_external_id_uniq"),
+        ]
 
     def __str__(self):
         return self.name
@@ -53,12 +85,17 @@ class Tag(models.Model):
 class ItemTag(models.Model):
     """M2M через кастомный through с доп. полями"""
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
-    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    # db_index=False: FK покрыт индексом core_item_tag_tag_item_idx (tag, item)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False)
     weight = models.IntegerField(default=0)
 
     class Meta:
         db_table = "core_item_tag"
         unique_together = (("item", "tag"),)
+        indexes = [
+            # фасеты: item_id по тегу без обращения к таблице (index-only scan)
+            models.Index(fields=["tag", "item"], name="core_item_tag_tag_item_idx"),
+        ]
 
 
 class Profile(models.Model):
@@ -85,3 +122,19 @@ class OrderItem(models.Model):
     class Meta:
         db_table = "core_order_item"
         unique_together = (("order", "item"),)
+
+
+class UserOrderStats(models.Model):
+    """
+    Агрегаты заказов пользователя. Поддерживаются инкрементально при создании заказов
+    (FastAPI, POST /demo/orders) и пересчётом при изменениях через Django (apps/core/order_stats.py).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="order_stats")
+    orders_count = models.PositiveIntegerField(default=0)
+    # число строк core_order_item (как считал /demo/orders_stats раньше)
+    items_count = models.PositiveIntegerField(default=0)
+    qty_total = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "core_user_order_stats"
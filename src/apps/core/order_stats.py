@@ -0,0 +1,66 @@
+# src/apps/core/order_stats.py
+"""
+Пересчёт core_user_order_stats из core_order / core_order_item.
+FastAPI обновляет агрегаты инкрементально в том же statement'е, что и создаёт заказы;
+здесь — полный пересчёт для изменений через Django (admin, ORM) и для backfill.
+"""
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Order, OrderItem, UserOrderStats
+
+# Строки агрегатов создаются заранее и блокируются (в порядке user_id) до подсчёта:
+# параллельный инкремент из FastAPI либо уже закоммичен и виден подсчёту,
+# либо ждёт нашей блокировки и прибавит свои заказы к пересчитанному значению.
+_ENSURE_SQL = f"""
+INSERT INTO {UserOrderStats._meta.db_table} (user_id, orders_count, items_count, qty_total, updated_at)
+SELECT u.id, 0, 0, 0, now() FROM unnest(%s::integer[]) AS u(id) ORDER BY u.id
+ON CONFLICT (user_id) DO NOTHING
+"""
+
+_LOCK_SQL = f"""
+SELECT user_id FROM {UserOrderStats._meta.db_table}
+WHERE user_id = ANY(%s) ORDER BY user_id FOR UPDATE
+"""
+
+_RECALC_SQL = f"""
+UPDATE {UserOrderStats._meta.db_table} s
+SET orders_count = coalesce(a.orders_count, 0),
+    items_count = coalesce(a.items_count, 0),
+    qty_total = coalesce(a.qty_total, 0),
+    updated_at = now()
+FROM unnest(%s::integer[]) AS u(id)
+LEFT JOIN (
+    SELECT o.user_id, count(DISTINCT o.id) AS orders_count, count(oi.id) AS items_count,
+           sum(oi.qty) AS qty_total
+    FROM {Order._meta.db_table} o
+    LEFT JOIN {OrderItem._meta.db_table} oi ON oi.order_id = o.id
+    WHERE o.user_id = ANY(%s)
+    GROUP BY o.user_id
+) a ON a.user_id = u.id
+WHERE s.user_id = u.id
+"""
+
+
+def recalc_order_stats(user_ids, using: str = DEFAULT_DB_ALIAS) -> int:
+    """ Пересчитывает агрегаты указанных пользователей; возвращает число строк """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(_ENSURE_SQL, [user_ids])
+        cursor.execute(_LOCK_SQL, [user_ids])
+        cursor.execute(_RECALC_SQL, [user_ids, user_ids])
+        return cursor.rowcount
+
+
+def iter_user_id_batches(batch_size: int, using: str = DEFAULT_DB_ALIAS):
+    """ id пользователей пачками по возрастанию (keyset, без OFFSET) — для backfill """
+    qs = get_user_model()._default_manager.using(using).order_by("pk").values_list("pk", flat=True)
+    last = None
+    while True:
+        batch = list((qs.filter(pk__gt=last) if last is not None else qs)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
@@ -0,0 +1,37 @@
+# src/apps/core/search.py
+"""
+Поиск по core_item.name: full-text по Item.search_vector (префиксы слов, ранжирование)
+ИЛИ pg_trgm word similarity (опечатки). Оба условия идут по своим GIN-индексам (BitmapOr).
+Общий для Django admin (ItemAdmin) и FastAPI (/demo/items/search — тот же SQL на SQLAlchemy).
+"""
+import re
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramWordSimilarity)
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+# Без стемминга: названия товаров на разных языках, важнее точные префиксы
+SEARCH_CONFIG = "simple"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def prefix_tsquery(text: str) -> str:
+    """ 'Red sho' -> 'red:* & sho:*' для to_tsquery; пустая строка — искать нечего """
+    return " & ".join(f"{word}:*" for word in _WORD_RE.findall(text.lower()))
+
+
+def search_items(queryset, text: str):
+    """ Совпадения с рангом search_rank (ts_rank + word_similarity), лучшие первыми """
+    tsquery = prefix_tsquery(text)
+    if not tsquery:
+        return queryset.none()
+    query = SearchQuery(tsquery, search_type="raw", config=SEARCH_CONFIG)
+    rank = SearchRank(F("search_vector"), query) + TrigramWordSimilarity(text, "name")
+    return (
+        queryset
+        .filter(Q(search_vector=query) | Q(name__trigram_word_similar=text))
+        .annotate(search_rank=Cast(rank, FloatField()))
+        .order_by("-search_rank", "-pk")
+    )
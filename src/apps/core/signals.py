@@ -1,29 +1,149 @@
 # src/apps/core/signals.py
 import logging
 import os
-import threading
 
-import requests
-from django.db.models.signals import post_migrate
+import redis
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_save)
 from django.dispatch import receiver
 
+from .models import Order, OrderItem, UserOrderStats
+from .order_stats import recalc_order_stats
+
 log = logging.getLogger("logger")
 
-FASTAPI_INTERNAL_URL = os.getenv("FASTAPI_INTERNAL_URL", "http://fastapi:8001")
-FASTAPI_REFRESH_TOKEN = os.getenv("FASTAPI_REFRESH_TOKEN", "")
+# Канал, который слушает каждый воркер FastAPI (см. fastapi_app/asyncdb/notify.py)
+FASTAPI_MAPPING_NOTIFY_CHANNEL = os.getenv("FASTAPI_MAPPING_NOTIFY_CHANNEL", "fastapi_refresh_mapping")
+
+# Кэш ответов FastAPI (см. fastapi_app/core/cache.py): версия тега = db_table модели
+FASTAPI_REDIS_URL = os.getenv("FASTAPI_REDIS_URL", "")
+CACHE_TAG_VERSION_PREFIX = "cache:tag:"
+# Воркеры FastAPI подписаны на канал и сразу обновляют локальные версии тегов
+FASTAPI_CACHE_TAGS_CHANNEL = os.getenv("FASTAPI_CACHE_TAGS_CHANNEL", "cache:tags")
+CACHE_APP_LABELS = {"core"}
 
+_redis_client = None
 
-def _notify_fastapi():
+
+def _notify_fastapi(using: str):
     try:
-        url = f"{FASTAPI_INTERNAL_URL}/api/_internal/refresh-mapping"
-        headers = {"X-Internal-Token": FASTAPI_REFRESH_TOKEN} if FASTAPI_REFRESH_TOKEN else {}
-        resp = requests.post(url, headers=headers, timeout=5)
-        log.info("Notified FastAPI to refresh mapping: %s %s", resp.status_code, resp.text[:200])
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [FASTAPI_MAPPING_NOTIFY_CHANNEL, "post_migrate"])
+        log.info("Notified FastAPI workers to refresh mapping via NOTIFY %s", FASTAPI_MAPPING_NOTIFY_CHANNEL)
     except Exception as e:
         log.warning("Failed to notify FastAPI to refresh mapping: %s", e)
 
 
 @receiver(post_migrate)
-def post_migrate_handler(sender, **kwargs):
-    # Чтобы не блокировать миграции — делаем вызов в отдельном потоке
-    threading.Thread(target=_notify_fastapi, daemon=True).start()
+def post_migrate_handler(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    # post_migrate приходит для каждого приложения — уведомляем один раз за migrate.
+    # NOTIFY доставляется всем LISTEN-соединениям (все воркеры и реплики FastAPI) сразу.
+    if sender.label != "core":
+        return
+    _notify_fastapi(using)
+
+
+def get_redis():
+    global _redis_client
+    if _redis_client is None and FASTAPI_REDIS_URL:
+        _redis_client = redis.Redis.from_url(FASTAPI_REDIS_URL, socket_timeout=1)
+    return _redis_client
+
+
+def bump_cache_tags(tags: set[str]):
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        tags = sorted(tags)
+        pipe = client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(CACHE_TAG_VERSION_PREFIX + tag)
+        versions = pipe.execute()
+        pipe = client.pipeline(transaction=False)
+        for tag, version in zip(tags, versions):
+            pipe.publish(FASTAPI_CACHE_TAGS_CHANNEL, f"{tag}={version}")
+        pipe.execute()
+    except Exception as e:
+        log.warning("Failed to invalidate FastAPI cache tags %s: %s", sorted(tags), e)
+
+
+def _invalidate_cache(model, using: str):
+    # после commit: иначе FastAPI может успеть закэшировать ещё старые данные
+    if model._meta.app_label not in CACHE_APP_LABELS:
+        return
+    tags = {model._meta.db_table}
+    transaction.on_commit(lambda: bump_cache_tags(tags), using=using)
+
+
+# NOTE: queryset.update()/bulk_create() сигналов не шлют — после них вызывайте bump_cache_tags сами
+@receiver(post_save)
+def cache_post_save_handler(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    _invalidate_cache(sender, using)
+
+
+@receiver(post_delete)
+def cache_post_delete_handler(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    _invalidate_cache(sender, using)
+
+
+@receiver(m2m_changed)
+def cache_m2m_changed_handler(sender, action, using=DEFAULT_DB_ALIAS, **kwargs):
+    # sender — through-модель (авто core_item_categories или ItemTag)
+    if action.startswith("post_"):
+        _invalidate_cache(sender, using)
+
+
+# Агрегаты заказов (core_user_order_stats): FastAPI обновляет их сам при создании заказов,
+# изменения через Django (admin, ORM) пересчитывают агрегаты пользователя в той же транзакции.
+# Перенос заказа / строки заказа к другому пользователю пересчитывает обоих: прежнего
+# пользователя pre_save запоминает в instance (_PREVIOUS_USER_ATTR).
+_PREVIOUS_USER_ATTR = "_order_stats_previous_user_id"
+
+
+def _recalc_user_order_stats(user_ids, using: str, origin=None):
+    # удаление пользователя каскадом удаляет и его агрегаты — пересчитывать нечего
+    origin_model = getattr(origin, "model", type(origin))
+    user_ids = {u for u in user_ids if u is not None}
+    if not user_ids or issubclass(origin_model, get_user_model()):
+        return
+    recalc_order_stats(user_ids, using=using)
+    _invalidate_cache(UserOrderStats, using)
+
+
+def _order_user_id(order_id, using: str):
+    return Order.objects.using(using).filter(pk=order_id).values_list("user_id", flat=True).first()
+
+
+@receiver(pre_save, sender=Order)
+def order_stats_order_pre_save_handler(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    setattr(instance, _PREVIOUS_USER_ATTR, _order_user_id(instance.pk, using) if instance.pk else None)
+
+
+@receiver(pre_save, sender=OrderItem)
+def order_stats_order_item_pre_save_handler(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = (
+            OrderItem.objects.using(using).filter(pk=instance.pk)
+            .values_list("order__user_id", flat=True).first()
+        )
+    setattr(instance, _PREVIOUS_USER_ATTR, previous)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def order_stats_order_handler(sender, instance, using=DEFAULT_DB_ALIAS, origin=None, **kwargs):
+    previous = instance.__dict__.pop(_PREVIOUS_USER_ATTR, None)
+    _recalc_user_order_stats({instance.user_id, previous}, using, origin)
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def order_stats_order_item_handler(sender, instance, using=DEFAULT_DB_ALIAS, origin=None, **kwargs):
+    previous = instance.__dict__.pop(_PREVIOUS_USER_ATTR, None)
+    # каскадное удаление заказа: пользователя один раз пересчитает post_delete
+    # самого заказа, а не каждая из его строк
+    if issubclass(getattr(origin, "model", type(origin)), Order):
+        return
+    _recalc_user_order_stats({_order_user_id(instance.order_id, using), previous}, using, origin)
@@ -0,0 +1,110 @@
+# src/apps/core/summary.py
+"""
+Каталожные агрегаты в materialized view core_item_summary (миграция 0010):
+items по поставщикам / категориям / тегам, сумма весов тегов, общий счётчик каталога.
+Читает FastAPI (/demo/summary), обновляет Celery beat (tasks.refresh_item_summary).
+
+"Грязный" флаг — версии тегов кэша FastAPI (cache:tag:<db_table>) исходных таблиц:
+их и так увеличивают все пути записи (сигналы Django, загрузка фидов, FastAPI).
+Версии отличаются от запомненных при прошлом обновлении — view пора обновить.
+"""
+import json
+import logging
+import os
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import Category, Item, ItemTag, Supplier, Tag
+from .signals import CACHE_TAG_VERSION_PREFIX, bump_cache_tags, get_redis
+
+log = logging.getLogger("logger")
+
+SUMMARY_VIEW = "core_item_summary"
+SOURCE_TABLES = tuple(sorted({
+    Item._meta.db_table, Item.categories.through._meta.db_table, Supplier._meta.db_table,
+    Category._meta.db_table, Tag._meta.db_table, ItemTag._meta.db_table,
+}))
+
+# Даже без изменений (или без Redis) view обновляется не реже раза в ITEM_SUMMARY_MAX_AGE секунд:
+# страховка от записей в обход сигналов (queryset.update(), ручной SQL)
+ITEM_SUMMARY_MAX_AGE = float(os.getenv("ITEM_SUMMARY_MAX_AGE", "3600"))
+
+_VERSIONS_KEY = f"summary:{SUMMARY_VIEW}:versions"
+_AGE_SQL = f"SELECT extract(epoch FROM now() - refreshed_at) FROM {SUMMARY_VIEW} WHERE kind = 'catalog'"
+# view без данных (REFRESH ... WITH NO DATA, восстановление без данных) не читается и не обновляется
+# CONCURRENTLY — он всегда "грязный", первое обновление — обычный REFRESH
+_POPULATED_SQL = "SELECT relispopulated FROM pg_class WHERE oid = %s::regclass"
+# try-lock: пока идёт одно обновление, следующие запуски beat не встают в очередь за ним
+_LOCK_SQL = "SELECT pg_try_advisory_xact_lock(hashtext(%s))"
+_REFRESH_SQL = f"REFRESH MATERIALIZED VIEW CONCURRENTLY {SUMMARY_VIEW}"
+_POPULATE_SQL = f"REFRESH MATERIALIZED VIEW {SUMMARY_VIEW}"
+
+
+def _populated(cursor) -> bool:
+    cursor.execute(_POPULATED_SQL, [SUMMARY_VIEW])
+    return cursor.fetchone()[0]
+
+
+def _source_versions() -> list | None:
+    """ Текущие версии тегов исходных таблиц; None — Redis не настроен или недоступен """
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        versions = client.mget([CACHE_TAG_VERSION_PREFIX + t for t in SOURCE_TABLES])
+    except Exception as e:
+        log.warning("Failed to read cache tag versions for %s: %s", SUMMARY_VIEW, e)
+        return None
+    return [v.decode() if v else None for v in versions]
+
+
+def _refreshed_versions() -> list | None:
+    try:
+        raw = get_redis().get(_VERSIONS_KEY)
+    except Exception:
+        return None
+    return json.loads(raw) if raw else None
+
+
+def _store_versions(versions: list) -> None:
+    try:
+        get_redis().set(_VERSIONS_KEY, json.dumps(versions))
+    except Exception as e:
+        log.warning("Failed to store %s versions: %s", SUMMARY_VIEW, e)
+
+
+def item_summary_dirty(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """ Исходные таблицы менялись после прошлого обновления или view старше ITEM_SUMMARY_MAX_AGE """
+    with connections[using].cursor() as cursor:
+        if not _populated(cursor):
+            return True
+    versions = _source_versions()
+    if versions is None:
+        return True
+    if versions != _refreshed_versions():
+        return True
+    with connections[using].cursor() as cursor:
+        cursor.execute(_AGE_SQL)
+        row = cursor.fetchone()
+    return row is None or row[0] >= ITEM_SUMMARY_MAX_AGE
+
+
+def refresh_item_summary(force: bool = False, using: str = DEFAULT_DB_ALIAS) -> str:
+    """ REFRESH ... CONCURRENTLY, если view "грязный" (или force); "refreshed" | "clean" | "busy" """
+    if not force and not item_summary_dirty(using):
+        return "clean"
+    # версии — до обновления: запись, закоммиченная во время REFRESH, оставит view грязным
+    versions = _source_versions()
+    started = time.monotonic()
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(_LOCK_SQL, [SUMMARY_VIEW])
+        if not cursor.fetchone()[0]:
+            return "busy"
+        # CONCURRENTLY: читатели view не блокируются, меняются только отличающиеся строки
+        cursor.execute(_REFRESH_SQL if _populated(cursor) else _POPULATE_SQL)
+    if versions is not None:
+        _store_versions(versions)
+    bump_cache_tags({SUMMARY_VIEW})
+    log.info("Refreshed %s in %.3fs", SUMMARY_VIEW, time.monotonic() - started)
+    return "refreshed"
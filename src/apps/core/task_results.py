@@ -0,0 +1,46 @@
+# src/apps/core/task_results.py
+"""
+Очистка результатов Celery в режиме CELERY_RESULT_STORE=django-db.
+Старше CELERY_RESULT_TTL удаляется пачками по CELERY_RESULT_PRUNE_BATCH строк: каждая пачка —
+своя короткая транзакция по индексу date_done, без одного огромного DELETE на весь хвост.
+SQL напрямую: ORM-delete() собрал бы строки в память ради сигналов post_delete.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+
+RESULT_MODELS = (TaskResult, GroupResult)
+
+
+def _delete_batch_sql(model) -> str:
+    table = model._meta.db_table
+    return f"""
+    DELETE FROM {table} WHERE id IN (
+        SELECT id FROM {table} WHERE date_done < %s ORDER BY date_done LIMIT %s
+    )
+    """
+
+
+def prune_task_results(ttl: int | None = None, batch_size: int | None = None,
+                       using: str = DEFAULT_DB_ALIAS) -> dict:
+    """ Удаляет результаты старше ttl секунд; возвращает {db_table: удалено строк} """
+    if ttl is None:
+        ttl = settings.CELERY_RESULT_TTL
+    cutoff = timezone.now() - timedelta(seconds=ttl)
+    batch_size = batch_size or settings.CELERY_RESULT_PRUNE_BATCH
+    deleted = {}
+    for model in RESULT_MODELS:
+        sql = _delete_batch_sql(model)
+        total = 0
+        while True:
+            with transaction.atomic(using=using), connections[using].cursor() as cursor:
+                cursor.execute(sql, [cutoff, batch_size])
+                count = cursor.rowcount
+            total += count
+            if count < batch_size:
+                break
+        deleted[model._meta.db_table] = total
+    return deleted
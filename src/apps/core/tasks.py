@@ -1,6 +1,17 @@
 import logging
+import time
 
 from celery import shared_task
+from django.conf import settings
+from django.db import connection, transaction
+
+from .batching import BatchTask
+from .ingest import TOUCHED_TABLES, ingest, parse
+from .models import UserOrderStats
+from .order_stats import recalc_order_stats
+from .signals import bump_cache_tags
+from .summary import refresh_item_summary as _refresh_item_summary
+from .task_results import prune_task_results as _prune_task_results
 
 logger = logging.getLogger("logger")
 
@@ -9,3 +20,46 @@ logger = logging.getLogger("logger")
 def test_task():
     logger.info(">>> Periodic test_task executed!")
     return "ok"
+
+
+# результат (счётчики загрузки) нужен вызывающему — храним, несмотря на CELERY_TASK_IGNORE_RESULT
+@shared_task(ignore_result=False)
+def ingest_items_feed(path: str, fmt: str = "ndjson") -> dict:
+    """ Фид поставщика из файла (NDJSON/CSV): та же загрузка, что POST /demo/items/ingest """
+    started = time.monotonic()
+    with open(path, "rb") as f:
+        batch = parse(f.read(), fmt)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        result = ingest(cursor, batch)
+    # COPY/SQL сигналов Django не шлют — инвалидируем кэш FastAPI сами, уже после commit
+    bump_cache_tags(TOUCHED_TABLES)
+
+    result["seconds"] = round(time.monotonic() - started, 3)
+    logger.info("Ingested items feed %s: %s", path, result)
+    return result
+
+
+@shared_task
+def refresh_item_summary(force: bool = False) -> str:
+    """ Beat (CELERY_BEAT_SCHEDULE): обновить core_item_summary, если исходные таблицы менялись """
+    return _refresh_item_summary(force=force)
+
+
+@shared_task(base=BatchTask)
+def recalc_user_order_stats(user_ids: list[int]) -> None:
+    """ Пакетная: пересчёт core_user_order_stats пачки пользователей одной транзакцией """
+    recalc_order_stats(user_ids)
+    bump_cache_tags({UserOrderStats._meta.db_table})
+
+
+@shared_task
+def prune_task_results() -> dict:
+    """ Beat: удалить результаты задач старше CELERY_RESULT_TTL (только для django-db) """
+    # запись beat остаётся в БД (DatabaseScheduler) и после смены режима — тогда ничего не делаем
+    if settings.CELERY_RESULT_STORE != "django-db":
+        return {}
+    started = time.monotonic()
+    deleted = _prune_task_results()
+    logger.info("Pruned task results %s in %.1fs", deleted, time.monotonic() - started)
+    return deleted
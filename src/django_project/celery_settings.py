@@ -3,13 +3,84 @@ import os
 from django_project.settings import TIME_ZONE
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "amqp://rabbitmq:5672//")
-CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "django-db")
 CELERY_TIMEZONE = TIME_ZONE
-CELERY_TASK_TRACK_STARTED = True
+# STARTED — лишняя запись в бэкенд на каждую задачу с результатом (до SUCCESS)
+CELERY_TASK_TRACK_STARTED = os.environ.get("CELERY_TASK_TRACK_STARTED", "0") == "1"
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 min
-# CELERY_BEAT_SCHEDULE = {
-#     "test-task-every-30s": {
-#         "task": "apps.core.tasks.test_task",  # путь к задаче
-#         "schedule": 30.0,  # каждые 30 секунд
-#     },
-# }
+
+# Результаты по умолчанию не пишутся: миллионы мелких задач — миллионы строк в бэкенде.
+# Нужен результат — ignore_result=False у задачи.
+CELERY_TASK_IGNORE_RESULT = os.environ.get("CELERY_TASK_IGNORE_RESULT", "1") == "1"
+
+# Где хранить результаты (CELERY_RESULT_STORE):
+#   django-db — таблицы django_celery_results в Postgres, видны в admin. Таблицы UNLOGGED
+#               (миграция core 0011: без WAL и репликации), старше CELERY_RESULT_TTL
+#               удаляются пачками задачей prune_task_results (beat);
+#   redis     — CELERY_RESULT_REDIS_URL, Redis сам удаляет ключи по TTL; Postgres не трогается;
+#   none      — не хранить вообще (AsyncResult.get() недоступен).
+# CELERY_RESULT_BACKEND (прежняя настройка) по-прежнему работает: любой бэкенд Celery как есть,
+# "django-db" — то же, что CELERY_RESULT_STORE=django-db. Задать обе — ошибка конфигурации.
+_RESULT_BACKEND_URL = os.environ.get("CELERY_RESULT_BACKEND", "")
+if _RESULT_BACKEND_URL and "CELERY_RESULT_STORE" in os.environ:
+    raise ValueError("Set either CELERY_RESULT_BACKEND or CELERY_RESULT_STORE, not both")
+CELERY_RESULT_STORE = os.environ.get("CELERY_RESULT_STORE", "django-db")
+CELERY_RESULT_TTL = int(os.environ.get("CELERY_RESULT_TTL", str(24 * 3600)))
+# name/args/kwargs/worker в результате — чтобы в admin было видно, что это за задача
+CELERY_RESULT_EXTENDED = os.environ.get("CELERY_RESULT_EXTENDED", "1") == "1"
+if _RESULT_BACKEND_URL and _RESULT_BACKEND_URL != "django-db":
+    CELERY_RESULT_STORE = "backend-url"
+    CELERY_RESULT_BACKEND = _RESULT_BACKEND_URL
+    CELERY_RESULT_EXPIRES = CELERY_RESULT_TTL
+elif CELERY_RESULT_STORE == "redis":
+    CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_REDIS_URL", "redis://redis:6379/1")
+    CELERY_RESULT_EXPIRES = CELERY_RESULT_TTL
+elif CELERY_RESULT_STORE == "none":
+    CELERY_RESULT_BACKEND = None
+    CELERY_TASK_IGNORE_RESULT = True
+elif CELERY_RESULT_STORE == "django-db":
+    CELERY_RESULT_BACKEND = "django-db"
+    # встроенный celery.backend_cleanup удаляет всё просроченное одним DELETE раз в сутки —
+    # выключен, вместо него prune_task_results
+    CELERY_RESULT_EXPIRES = None
+else:
+    raise ValueError(f"Unknown CELERY_RESULT_STORE: {CELERY_RESULT_STORE!r}")
+# prune_task_results: как часто (секунд) и сколько строк удалять одной транзакцией
+CELERY_RESULT_PRUNE_INTERVAL = float(os.environ.get("CELERY_RESULT_PRUNE_INTERVAL", "300"))
+CELERY_RESULT_PRUNE_BATCH = int(os.environ.get("CELERY_RESULT_PRUNE_BATCH", "5000"))
+
+# Воркер. acks_late: сообщение подтверждается после выполнения — при падении воркера задача
+# вернётся в очередь (задачи должны быть идемпотентны); с ним обычно prefetch = 1.
+CELERY_TASK_ACKS_LATE = os.environ.get("CELERY_TASK_ACKS_LATE", "0") == "1"
+CELERY_TASK_REJECT_ON_WORKER_LOST = CELERY_TASK_ACKS_LATE
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.environ.get("CELERY_WORKER_PREFETCH_MULTIPLIER", "4"))
+# 0 — по числу CPU / без ограничения
+CELERY_WORKER_CONCURRENCY = int(os.environ.get("CELERY_WORKER_CONCURRENCY", "0")) or None
+CELERY_WORKER_MAX_TASKS_PER_CHILD = int(os.environ.get("CELERY_WORKER_MAX_TASKS_PER_CHILD", "0")) or None
+
+# Пакетные задачи (apps/core/batching.py): flush буфера по размеру или по возрасту, секунд
+BATCH_TASK_SIZE = int(os.environ.get("BATCH_TASK_SIZE", "500"))
+BATCH_TASK_INTERVAL = float(os.environ.get("BATCH_TASK_INTERVAL", "1.0"))
+
+# Как часто beat проверяет "грязный" флаг core_item_summary (apps/core/summary.py), секунд
+ITEM_SUMMARY_REFRESH_INTERVAL = float(os.environ.get("ITEM_SUMMARY_REFRESH_INTERVAL", "30"))
+
+# DatabaseScheduler (django-celery-beat) при старте переносит эти записи в БД
+CELERY_BEAT_SCHEDULE = {
+    # "test-task-every-30s": {
+    #     "task": "apps.core.tasks.test_task",  # путь к задаче
+    #     "schedule": 30.0,  # каждые 30 секунд
+    # },
+    "refresh-item-summary": {
+        "task": "apps.core.tasks.refresh_item_summary",
+        "schedule": ITEM_SUMMARY_REFRESH_INTERVAL,
+        # не копим проверки, если воркеры заняты: следующая всё равно придёт через интервал
+        "options": {"expires": ITEM_SUMMARY_REFRESH_INTERVAL},
+    },
+}
+
+if CELERY_RESULT_STORE == "django-db":
+    CELERY_BEAT_SCHEDULE["prune-task-results"] = {
+        "task": "apps.core.tasks.prune_task_results",
+        "schedule": CELERY_RESULT_PRUNE_INTERVAL,
+        "options": {"expires": CELERY_RESULT_PRUNE_INTERVAL},
+    }
@@ -14,6 +14,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_celery_beat",
     "django_celery_results",
     "apps.core",
@@ -85,9 +86,6 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Celery
 from .celery_settings import *  # noqa
 
-# django-celery-results
-CELERY_RESULT_EXTENDED = True
-
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:80',
     'http://0.0.0.0:80',
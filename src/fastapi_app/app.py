@@ -1,18 +1,26 @@
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 
-from .asyncdb.auto import refresh_mapping
+from .asyncdb.auto import refresh_mapping, watch_mapping
+from .asyncdb.notify import listen_mapping_changes
+from .asyncdb.replicas import replicas, watch_replicas
+from .core.cache import close_redis, listen_cache_tags
+from .core.deps import cursor_secret
 from .core.django_init import ensure_django_initialized
 from .core.exceptions import install_exception_handlers
 from .core.middlewares import install_middlewares
+from .core.responses import get_response_class
 from .settings.config import settings
 from .settings.logging import enable_udp_logging, setup_logging
 
 
 def create_app() -> FastAPI:
     setup_logging()
+    # курсоры пагинации подписываются этим секретом — без него не стартуем (RuntimeError)
+    cursor_secret()
 
     # ВАЖНО: инициализируем Django ПРЯМО СЕЙЧАС,
     # до импорта роутов и их моделей
@@ -27,11 +35,28 @@ def create_app() -> FastAPI:
         except Exception:
             pass
 
+        background: list[asyncio.Task] = []
+        if settings.mapping_mode == "reflect":
+            if settings.mapping_check_interval > 0:
+                background.append(asyncio.create_task(watch_mapping(settings.mapping_check_interval)))
+            if settings.mapping_listen:
+                background.append(asyncio.create_task(listen_mapping_changes(settings.mapping_notify_channel)))
+        if settings.redis_url:
+            background.append(asyncio.create_task(listen_cache_tags(settings.cache_tags_channel)))
+        if replicas.replicas:
+            background.append(asyncio.create_task(watch_replicas(settings.replica_lag_check_interval)))
+
         try:
             yield
         finally:
             # тут можно закрыть ресурсы при shutdown
-            pass
+            for task in background:
+                task.cancel()
+            for task in background:
+                with suppress(asyncio.CancelledError):
+                    await task
+            await replicas.dispose()
+            await close_redis()
 
     app = FastAPI(
         title=settings.project_name,
@@ -39,6 +64,7 @@ def create_app() -> FastAPI:
         docs_url=f"{settings.api_prefix}/docs" if settings.enable_swagger else None,
         redoc_url=None,
         lifespan=lifespan,
+        default_response_class=get_response_class(settings),
     )
 
     # Теперь можно подтягивать роуты
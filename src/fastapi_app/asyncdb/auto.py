@@ -1,11 +1,20 @@
 # src/fastapi_app/asyncdb/auto.py
 
+import asyncio
 import hashlib
 import inspect
+import logging
+import os
+import pickle
+import stat
+import tempfile
 from collections import Counter
-from dataclasses import dataclass
-from typing import Optional
+from contextlib import suppress
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
 
+import sqlalchemy
 from django.apps import apps as django_apps
 from django.db.models import Model
 from sqlalchemy import MetaData
@@ -15,32 +24,119 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 from sqlalchemy.ext.automap import automap_base
 
 from ..core.django_init import ensure_django_initialized
+from ..settings.config import settings
 from .engine import engine
+from .static import build_static_metadata, static_signature
+
+logger = logging.getLogger("logger")
+
+# Версия формата снапшота: меняем, если меняется структура pickle
+SNAPSHOT_FORMAT = 1
 
 
 def snake_to_pascal(s: str) -> str:
     return "".join(p.capitalize() for p in s.split("_") if p)
 
 
-@dataclass
+@dataclass(frozen=True)
+class MappingSnapshot:
+    """
+    Неизменяемый снимок маппинга. Собирается целиком в стороне и подменяется
+    одним присваиванием ссылки — запрос никогда не видит наполовину обновлённое состояние.
+    """
+    migration_sig: str
+    Base: Any
+    metadata: MetaData
+    class_by_table: Mapping[str, str]  # db_table -> SA class name (read-only)
+    # Django-класс / "app_label.Model" / уникальное "Model" -> SA-класс (см. get_mapped_class)
+    resolve: Mapping[Any, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # Готовые параметризованные statement'ы этой версии маппинга (см. register_statement)
+    statements: dict[str, Any] = field(default_factory=dict)
+
+    def mapped(self, target):
+        """ get_mapped_class в рамках именно этого снимка (для сборки statement'ов) """
+        return _resolve(self, target)
+
+
 class MappingState:
-    migration_sig: str = ""
-    Base = None
-    metadata: Optional[MetaData] = None
-    class_by_table: dict[str, str] = None  # db_table -> SA class name
+    """
+    Держатель текущего снимка. Атрибуты проксируются в снимок для совместимости;
+    если нужно несколько полей сразу — берите state.snapshot один раз.
+    """
+    def __init__(self) -> None:
+        self.snapshot: Optional[MappingSnapshot] = None
 
+    @property
+    def migration_sig(self) -> str:
+        snap = self.snapshot
+        return snap.migration_sig if snap is not None else ""
 
-state = MappingState(class_by_table={})
+    @property
+    def Base(self):
+        snap = self.snapshot
+        return snap.Base if snap is not None else None
 
+    @property
+    def metadata(self) -> Optional[MetaData]:
+        snap = self.snapshot
+        return snap.metadata if snap is not None else None
 
-async def _calc_migration_signature(conn: AsyncConnection) -> str:
+    @property
+    def class_by_table(self) -> Mapping[str, str]:
+        snap = self.snapshot
+        return snap.class_by_table if snap is not None else MappingProxyType({})
+
+
+state = MappingState()
+
+# name -> builder(snapshot) -> statement; регистрируются роутами при импорте
+_statement_builders: dict[str, Callable[[MappingSnapshot], Any]] = {}
+
+# single-flight: один refresh в полёте на процесс, остальные вызовы его дожидаются
+_inflight: Optional[asyncio.Task] = None
+_inflight_force = False
+
+
+async def _calc_full_migration_signature(conn: AsyncConnection) -> str:
+    """ Полный хэш всех строк django_migrations — дорого, но ловит любые подмены """
     rows = (await conn.execute(text(
         "SELECT app, name FROM django_migrations ORDER BY app, name"
     ))).all()
     digest = hashlib.sha256()
     for app, name in rows:
         digest.update(app.encode("utf-8") + b":" + name.encode("utf-8") + b";")
-    return digest.hexdigest()
+    return f"sha256:{digest.hexdigest()}"
+
+
+async def _calc_migration_signature(conn: AsyncConnection) -> str:
+    """
+    Инкрементальная сигнатура: count(*) + max(id).
+    migrate только дописывает строки (id растёт), откат/squash удаляет — меняется count.
+    Одна строка результата вместо всей таблицы, поэтому годится для частых проверок.
+    """
+    if settings.mapping_signature == "full":
+        return await _calc_full_migration_signature(conn)
+    count, max_id = (await conn.execute(text(
+        "SELECT count(*), coalesce(max(id), 0) FROM django_migrations"
+    ))).one()
+    return f"{count}:{max_id}"
+
+
+def _build_class_by_table() -> dict[str, str]:
+    """ Карта db_table -> имя SA-класса: ModelName или AppLabel+ModelName при коллизиях """
+    django_models = list(django_apps.get_models())
+    counts = Counter(m.__name__ for m in django_models)
+
+    class_by_table: dict[str, str] = {}
+    for m in django_models:
+        db_table = m._meta.db_table
+        model_name = m.__name__
+        if counts[model_name] == 1:
+            sa_name = model_name
+        else:
+            sa_name = f"{m._meta.app_label.capitalize()}{model_name}"
+        class_by_table[db_table] = sa_name
+    return class_by_table
 
 
 def _build_table_allowlist() -> set[str]:
@@ -57,8 +153,72 @@ def _build_table_allowlist() -> set[str]:
     return allow
 
 
-def _classname_for_table(base, tablename: str, table):
-    return state.class_by_table.get(tablename, snake_to_pascal(tablename))
+def _snapshot_key(sig: str, allow: set[str]) -> str:
+    # сигнатура миграций + набор таблиц моделей + версия SQLAlchemy (формат pickle)
+    tables = hashlib.sha256(",".join(sorted(allow)).encode("utf-8")).hexdigest()
+    return f"{SNAPSHOT_FORMAT}:{sqlalchemy.__version__}:{sig}:{tables}"
+
+
+def _open_trusted(path: str):
+    """
+    pickle.load исполняет код из файла — читаем только файл, который мог записать лишь этот
+    пользователь: владелец — мы, нет записи для group/other, то же для директории; без симлинков.
+    """
+    uid = os.geteuid()
+    directory = os.stat(os.path.dirname(os.path.abspath(path)))
+    if directory.st_uid not in (uid, 0) or directory.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError("snapshot directory is writable by other users")
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode) or st.st_uid != uid or st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        os.close(fd)
+        raise PermissionError("snapshot file is not owned by the current user or is writable by others")
+    return os.fdopen(fd, "rb")
+
+
+def _load_snapshot(key: str) -> Optional[tuple[MetaData, dict[str, str]]]:
+    """ Снапшот отражённой схемы с диска, если он снят при той же сигнатуре """
+    path = settings.mapping_snapshot_path
+    if not path:
+        return None
+    try:
+        with _open_trusted(path) as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Failed to load automap snapshot %s: %s", path, e)
+        return None
+    if not isinstance(data, dict) or data.get("key") != key:
+        return None
+    return data["metadata"], data["class_by_table"]
+
+
+def _save_snapshot(key: str, md: MetaData, class_by_table: dict[str, str]) -> None:
+    """ Атомарная запись: tmp-файл в той же директории + os.replace """
+    path = settings.mapping_snapshot_path
+    if not path:
+        return
+    tmp = None
+    try:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".automap-", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {"key": key, "metadata": md, "class_by_table": class_by_table},
+                f, protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, path)
+        tmp = None
+    except Exception as e:
+        logger.warning("Failed to save automap snapshot %s: %s", path, e)
+    finally:
+        if tmp is not None:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
 
 
 def _name_for_scalar_relationship(base, local_cls, referred_cls, constraint):
@@ -69,37 +229,111 @@ def _name_for_collection_relationship(base, local_cls, referred_cls, constraint)
     return f"{referred_cls.__name__.lower()}_set"
 
 
+def _build_snapshot(sig: str, md: MetaData, class_by_table: dict[str, str]) -> MappingSnapshot:
+    """
+    Собирает automap поверх уже заполненного MetaData (reflection/снапшот/static).
+    Ничего не трогает в глобальном state; мапперы конфигурируются сразу,
+    а не лениво на первом запросе после подмены.
+    """
+    class_by_table = MappingProxyType(dict(class_by_table))
+
+    def _classname_for_table(base, tablename: str, table):
+        return class_by_table.get(tablename, snake_to_pascal(tablename))
+
+    Base = automap_base(metadata=md)
+    Base.prepare(
+        classname_for_table=_classname_for_table,
+        name_for_scalar_relationship=_name_for_scalar_relationship,
+        name_for_collection_relationship=_name_for_collection_relationship,
+    )
+    Base.registry.configure()
+    snap = MappingSnapshot(
+        migration_sig=sig, Base=Base, metadata=md, class_by_table=class_by_table,
+        resolve=MappingProxyType(_build_resolve_index(Base, class_by_table)),
+    )
+    _prebuild_statements(snap)
+    return snap
+
+
+def _build_resolve_index(Base, class_by_table: Mapping[str, str]) -> dict:
+    """
+    Индекс для get_mapped_class: всё, что можно разрешить, считается один раз на снимок.
+    Неоднозначные/несуществующие имена сюда не попадают — их обрабатывает медленный путь с ошибками.
+    """
+    django_models = list(django_apps.get_models())
+    counts = Counter(m.__name__ for m in django_models)
+
+    index: dict = {}
+    for m in django_models:
+        sa_name = class_by_table.get(m._meta.db_table)
+        sa_cls = getattr(Base.classes, sa_name, None) if sa_name else None
+        if sa_cls is None:
+            continue  # таблицы ещё нет в БД
+        label = m._meta.app_label
+        index[m] = sa_cls
+        index[f"{label}.{m.__name__}"] = sa_cls
+        index[f"{label}.{m._meta.model_name}"] = sa_cls
+        if counts[m.__name__] == 1:
+            index[m.__name__] = sa_cls
+    return index
+
+
 async def refresh_mapping(force: bool = False) -> None:
     """
     Безопасно пересобирает automap:
     - Считает сигнатуру миграций
     - Строит устойчивые имена SA-классов: ModelName или AppLabel+ModelName при коллизиях
     - Reflect делает ТОЛЬКО по реально существующим таблицам (чтобы не падать до миграций)
+    - Если на диске есть снапшот с той же сигнатурой — собирает маппинг из него без reflection
+    - В режиме mapping_mode="static" строит таблицы из Django _meta, не обращаясь к БД
+    Конкурентные вызовы склеиваются в один (single-flight), результат подменяется атомарно.
     """
+    global _inflight, _inflight_force
+    loop = asyncio.get_running_loop()
+    while True:
+        task = _inflight
+        if task is None or task.done() or task.get_loop() is not loop:
+            break
+        if _inflight_force or not force:
+            # shield: отмена ожидающего запроса не отменяет общий refresh
+            await asyncio.shield(task)
+            return
+        # в полёте обычная проверка, а нас просят пересобрать принудительно — ждём и идём сами
+        with suppress(Exception):
+            await asyncio.shield(task)
+
+    task = loop.create_task(_refresh_mapping(force))
+    _inflight, _inflight_force = task, force
+    await asyncio.shield(task)
+
+
+async def _refresh_mapping(force: bool) -> None:
     ensure_django_initialized("django_project.settings")
 
+    if settings.mapping_mode == "static":
+        _refresh_static(force)
+        return
+
     async with engine.begin() as conn:
         sig = await _calc_migration_signature(conn)
-        if not force and sig == state.migration_sig and state.Base is not None:
+        current = state.snapshot
+        if not force and current is not None and sig == current.migration_sig:
             return
 
         # 1) Карта db_table -> имя SA-класса (устойчивые имена)
-        django_models = list(django_apps.get_models())
-        counts = Counter(m.__name__ for m in django_models)
-
-        class_by_table: dict[str, str] = {}
-        for m in django_models:
-            db_table = m._meta.db_table
-            model_name = m.__name__
-            if counts[model_name] == 1:
-                sa_name = model_name
-            else:
-                sa_name = f"{m._meta.app_label.capitalize()}{model_name}"
-            class_by_table[db_table] = sa_name
+        class_by_table = _build_class_by_table()
 
         # 2) Allowlist (по моделям и m2m), но отражаем только существующие таблицы
         allow = _build_table_allowlist()
 
+        # 2.1) Снапшот с диска: тот же набор миграций -> та же схема, reflection не нужен
+        snapshot_key = _snapshot_key(sig, allow)
+        snapshot = _load_snapshot(snapshot_key)
+        if snapshot is not None:
+            md, class_by_table = snapshot
+            state.snapshot = _build_snapshot(sig, md, class_by_table)
+            return
+
         def _existing_tables(sync_conn):
             insp = sa_inspect(sync_conn)
             # NOTE: ограничиваемся default schema (public); добавь schema_name при необходимости
@@ -110,35 +344,72 @@ async def refresh_mapping(force: bool = False) -> None:
 
         if not to_reflect:
             # Нечего отражать сейчас — видимо, миграции ещё не накатывались.
-            # Просто обновим сигнатуру и карту имён; watcher/сигнал подтянут после migrate.
-            state.migration_sig = sig
-            state.class_by_table = class_by_table
-            state.Base = automap_base(metadata=MetaData())  # пустая база, но валидная
-            state.metadata = state.Base.metadata
+            # Пустая, но валидная база; watcher/сигнал подтянут после migrate.
+            state.snapshot = _build_snapshot(sig, MetaData(), class_by_table)
             return
 
         md = MetaData()
-        # reflect только существующие
+        # reflect только существующие; automap дальше работает по уже отражённому MetaData
         await conn.run_sync(md.reflect, only=to_reflect)
 
-        Base = automap_base(metadata=md)
+    # сборка и подмена — вне транзакции, соединение уже вернулось в пул
+    state.snapshot = _build_snapshot(sig, md, class_by_table)
+    _save_snapshot(snapshot_key, md, class_by_table)
 
-        def _prepare(sync_conn):
-            Base.prepare(
-                autoload_with=sync_conn,
-                classname_for_table=_classname_for_table,
-                name_for_scalar_relationship=_name_for_scalar_relationship,
-                name_for_collection_relationship=_name_for_collection_relationship,
-            )
 
-        # сделаем карту видимой для _classname_for_table
-        state.class_by_table = class_by_table
-        await conn.run_sync(_prepare)
+def _refresh_static(force: bool) -> None:
+    """ Маппинг из Django _meta: ни одного запроса к БД, работает и до её готовности """
+    md = build_static_metadata()
+    sig = static_signature(md)
+    current = state.snapshot
+    if not force and current is not None and sig == current.migration_sig:
+        return
+    state.snapshot = _build_snapshot(sig, md, _build_class_by_table())
+
+
+async def watch_mapping(interval: float) -> None:
+    """
+    Периодическая проверка свежести маппинга в каждом воркере.
+    Дёшево: при неизменной сигнатуре это один запрос count/max по django_migrations.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_mapping(force=False)
+        except Exception as e:
+            logger.warning("Mapping freshness check failed: %s", e)
+
 
-        # зафиксировать состояние
-        state.Base = Base
-        state.metadata = md
-        state.migration_sig = sig
+def register_statement(name: str):
+    """
+    Декоратор: регистрирует сборщик statement'а для текущей версии маппинга.
+    Statement собирается один раз на снимок (сразу после refresh_mapping) и выбрасывается
+    вместе со снимком; в запросе остаётся только биндинг параметров (bindparam).
+    """
+    def decorator(builder: Callable[[MappingSnapshot], Any]):
+        _statement_builders[name] = builder
+        return builder
+    return decorator
+
+
+def _prebuild_statements(snap: MappingSnapshot) -> None:
+    for name, builder in _statement_builders.items():
+        try:
+            snap.statements[name] = builder(snap)
+        except Exception:
+            # например, таблиц ещё нет до migrate — соберём лениво в get_statement
+            pass
+
+
+def get_statement(name: str):
+    """ Готовый statement из текущего снимка маппинга """
+    snap = state.snapshot
+    if snap is None:
+        raise RuntimeError("AutoMap is not initialized. Call refresh_mapping() first.")
+    stmt = snap.statements.get(name)
+    if stmt is None:
+        stmt = snap.statements[name] = _statement_builders[name](snap)
+    return stmt
 
 
 def get_mapped_class(target):
@@ -148,14 +419,26 @@ def get_mapped_class(target):
       - "ModelName": если имя уникально среди всех apps
       - "app_label.ModelName": точное указание
     """
-    if state.Base is None:
+    snap = state.snapshot  # один снимок на весь вызов
+    if snap is None:
         raise RuntimeError("AutoMap is not initialized. Call refresh_mapping() first.")
+    return _resolve(snap, target)
+
+
+def _resolve(snap: MappingSnapshot, target):
+    # 0) Быстрый путь: один поиск в индексе снимка
+    try:
+        sa_cls = snap.resolve.get(target)
+    except TypeError:  # нехешируемый target — дальше будет понятная ошибка
+        sa_cls = None
+    if sa_cls is not None:
+        return sa_cls
 
     # 1) Django класс — самый надёжный путь
     if inspect.isclass(target) and issubclass(target, Model):
         db_table = target._meta.db_table
-        sa_name = state.class_by_table[db_table]  # имя класса, которое мы зафиксировали в refresh_mapping
-        return getattr(state.Base.classes, sa_name)
+        sa_name = snap.class_by_table[db_table]  # имя класса, которое мы зафиксировали в refresh_mapping
+        return getattr(snap.Base.classes, sa_name)
 
     # 2) Строки
     if isinstance(target, str):
@@ -168,8 +451,8 @@ def get_mapped_class(target):
             if m is None:
                 raise KeyError(f"Django model '{name}' not found")
             db_table = m._meta.db_table
-            sa_name = state.class_by_table[db_table]
-            return getattr(state.Base.classes, sa_name)
+            sa_name = snap.class_by_table[db_table]
+            return getattr(snap.Base.classes, sa_name)
 
         # просто "ModelName" — проверим уникальность
         matches = [m for m in django_apps.get_models() if m.__name__ == name]
@@ -183,7 +466,7 @@ def get_mapped_class(target):
             )
         m = matches[0]
         db_table = m._meta.db_table
-        sa_name = state.class_by_table[db_table]
-        return getattr(state.Base.classes, sa_name)
+        sa_name = snap.class_by_table[db_table]
+        return getattr(snap.Base.classes, sa_name)
 
     raise TypeError(f"Unsupported target type: {type(target)}")
@@ -1,8 +1,15 @@
 import os
-from typing import AsyncGenerator
+import time
+import weakref
+from typing import Any, AsyncGenerator
+from uuid import uuid4
 
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     async_sessionmaker, create_async_engine)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..settings.config import settings
 
 ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 if not ASYNC_DATABASE_URL:
@@ -14,10 +21,124 @@ if not ASYNC_DATABASE_URL:
     db = os.getenv("POSTGRES_DB", "app_db")
     ASYNC_DATABASE_URL = f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{db}"
 
-engine: AsyncEngine = create_async_engine(
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """ QueuePool со счётчиками ожидания соединения (для /_internal/pool-stats) """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # SQLAlchemy пересоздаёт пул при dispose()/invalidate — счётчики переносим
+        new = super().recreate()
+        new.checkouts, new.timeouts = self.checkouts, self.timeouts
+        new.wait_total, new.wait_max = self.wait_total, self.wait_max
+        return new
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+def _install_liveness_check(async_engine: AsyncEngine, interval: float) -> None:
+    """
+    Вместо pre-ping на каждом checkout: пингуем только соединение, простоявшее в пуле
+    дольше interval секунд. Мёртвое соединение -> DisconnectionError, пул берёт/создаёт другое.
+    """
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        idle = time.monotonic() - connection_record.info.get("last_used", 0.0)
+        if idle < interval:
+            return
+        try:
+            alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            raise exc.DisconnectionError("connection was idle for %.0fs and failed ping" % idle)
+        connection_record.info["last_used"] = time.monotonic()
+
+
+def _pgbouncer_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _connect_args() -> dict:
+    if settings.db_pgbouncer:
+        # PgBouncer (transaction pooling): соседние транзакции могут попасть на разные
+        # backend'ы, поэтому никаких закэшированных prepared statements между ними.
+        # SQLAlchemy готовит statement с уникальным именем в той же транзакции,
+        # asyncpg (raw fast path) без кэша использует безымянные statement'ы.
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _pgbouncer_statement_name,
+        }
+    # кэш prepared statements адаптера SQLAlchemy и самого asyncpg (raw fast path)
+    return {
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "statement_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def create_pooled_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    """ AsyncEngine с пулом и кэшем statement'ов из Settings (primary и реплики) """
+    async_engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_timeout=settings.db_pool_timeout,
+        pool_pre_ping=settings.db_pre_ping,
+        connect_args=_connect_args(),
+        echo=False,
+    )
+    if not settings.db_pre_ping and settings.db_liveness_interval > 0:
+        _install_liveness_check(async_engine, settings.db_liveness_interval)
+    return async_engine
+
+
+engine: AsyncEngine = create_pooled_engine(
     ASYNC_DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
 )
 
 SessionLocal = async_sessionmaker(
@@ -28,3 +149,32 @@ SessionLocal = async_sessionmaker(
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+# ---------- Raw asyncpg fast path ----------
+# Для read-only списков: SQL компилируется один раз на statement, выполняется напрямую
+# через asyncpg (его кэш prepared statements), строки остаются asyncpg.Record —
+# без Row/RowMapping/dict и без result-процессоров SQLAlchemy.
+
+_compiled_raw: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+def _compile_raw(stmt):
+    compiled = _compiled_raw.get(stmt)
+    if compiled is None:
+        compiled = _compiled_raw[stmt] = stmt.compile(dialect=engine.dialect)
+    return compiled
+
+
+async def fetch_records(session: AsyncSession, stmt, params: dict | None = None) -> list:
+    """
+    Выполняет statement через asyncpg-соединение сессии и возвращает список asyncpg.Record.
+    Только для простых SELECT: bind/result-процессоры типов SQLAlchemy не применяются.
+    """
+    compiled = _compile_raw(stmt)
+    values = compiled.construct_params(params or {})
+    args = [values[name] for name in compiled.positiontup]
+
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    return await raw.driver_connection.fetch(compiled.string, *args)
@@ -0,0 +1,79 @@
+# src/fastapi_app/asyncdb/notify.py
+"""
+Широковещательная инвалидация маппинга через Postgres LISTEN/NOTIFY.
+Django после migrate делает pg_notify(channel), каждый воркер FastAPI держит
+отдельное asyncpg-соединение с LISTEN и пересобирает маппинг у себя.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from ..settings.config import settings
+from .auto import refresh_mapping
+from .engine import engine
+
+logger = logging.getLogger("logger")
+
+# Как часто проверять живость LISTEN-соединения, если уведомлений нет
+_PING_INTERVAL = 60.0
+
+_tasks: set[asyncio.Task] = set()
+
+
+def _listen_dsn() -> str:
+    # LISTEN держит сессию — за PgBouncer (transaction mode) нужен прямой адрес Postgres
+    url = make_url(settings.mapping_listen_url) if settings.mapping_listen_url else engine.url
+    # формат asyncpg (без "+asyncpg")
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def _refresh(payload: str) -> None:
+    try:
+        await refresh_mapping(force=False)
+        logger.info("Mapping refreshed by NOTIFY (%s)", payload)
+    except Exception as e:
+        logger.warning("Failed to refresh mapping by NOTIFY: %s", e)
+
+
+def _on_notify(conn, pid, channel, payload) -> None:
+    task = asyncio.get_running_loop().create_task(_refresh(payload))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def listen_mapping_changes(channel: str) -> None:
+    """
+    Держит LISTEN-соединение и переподключается с backoff при обрыве.
+    После каждого (пере)подключения сверяет сигнатуру: NOTIFY мог прийти, пока связи не было.
+    """
+    backoff = 1.0
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(_listen_dsn())
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: closed.set())
+            await conn.add_listener(channel, _on_notify)
+            backoff = 1.0
+
+            await refresh_mapping(force=False)
+
+            while not closed.is_set():
+                try:
+                    await asyncio.wait_for(closed.wait(), timeout=_PING_INTERVAL)
+                except asyncio.TimeoutError:
+                    await conn.execute("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Mapping LISTEN connection lost: %s", e)
+        finally:
+            if conn is not None:
+                with suppress(Exception):
+                    await conn.close(timeout=5)
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
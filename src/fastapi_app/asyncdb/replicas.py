@@ -0,0 +1,207 @@
+# src/fastapi_app/asyncdb/replicas.py
+"""
+Чтение с реплик. Для каждого URL из settings.replica_database_urls — свой AsyncEngine
+со своим пулом; read-only роуты берут сессию через get_async_read_session.
+Выбор реплики: round_robin или least_loaded (меньше всего занятых соединений в пуле).
+Реплика с лагом больше replica_max_lag (или недоступная) не выбирается — читаем с primary.
+Внутри primary_reads() read-сессии читают с primary (пересчёт кэша после смены версии тега).
+"""
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncGenerator, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from ..settings.config import settings
+from .engine import create_pooled_engine, engine
+
+logger = logging.getLogger("logger")
+
+# Лаг в секундах относительно позиции WAL primary, снятой перед замером (:primary_lsn).
+# Всё до неё применено — реплика догнала primary, даже если primary простаивает.
+# Иначе — возраст последней применённой транзакции: у отключившейся реплики (упал WAL receiver,
+# сломалась репликация) он растёт, пока primary пишет. NULL — лаг неизвестен (реплика не используется).
+# primary недоступен — сравниваем с полученным самой репликой WAL (лучше, чем не читать вовсе).
+_PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_replay_lsn() >= coalesce(CAST(CAST(:primary_lsn AS text) AS pg_lsn), pg_last_wal_receive_lsn()) THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+""")
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    # None — лаг ещё не измерен, неизвестен или реплика недоступна
+    lag: Optional[float] = None
+    measured_at: float = 0.0  # time.monotonic() последнего замера
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def load(self) -> int:
+        return self.engine.pool.checkedout()
+
+    def current_lag(self, max_age: float) -> Optional[float]:
+        """ Лаг последнего замера; замер старше max_age секунд (проверка зависла) — None """
+        if self.lag is None or time.monotonic() - self.measured_at > max_age:
+            return None
+        return self.lag
+
+
+class ReplicaSet:
+    def __init__(self, replicas: list[Replica], strategy: str, max_lag: float,
+                 check_timeout: float, max_age: float):
+        self.replicas = replicas
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.check_timeout = check_timeout
+        self.max_age = max_age
+        self._rr = itertools.count()
+
+    def available(self) -> list[Replica]:
+        return [
+            r for r in self.replicas
+            if (lag := r.current_lag(self.max_age)) is not None and lag <= self.max_lag
+        ]
+
+    def pick(self) -> AsyncEngine:
+        """ Engine для чтения: подходящая реплика или primary """
+        candidates = self.available()
+        if not candidates:
+            return engine
+        if self.strategy == "least_loaded":
+            return min(candidates, key=Replica.load).engine
+        return candidates[next(self._rr) % len(candidates)].engine
+
+    async def _primary_lsn(self) -> Optional[str]:
+        async def read() -> str:
+            async with engine.connect() as conn:
+                return (await conn.execute(_PRIMARY_LSN_SQL)).scalar_one()
+        try:
+            return await asyncio.wait_for(read(), self.check_timeout)
+        except Exception as e:
+            logger.warning("Failed to read primary WAL position: %s", e or type(e).__name__)
+            return None
+
+    @staticmethod
+    async def _probe(replica: Replica, primary_lsn: Optional[str]) -> Optional[float]:
+        async with replica.engine.connect() as conn:
+            lag = (await conn.execute(_LAG_SQL, {"primary_lsn": primary_lsn})).scalar_one()
+        return None if lag is None else float(lag)
+
+    async def _check_replica(self, replica: Replica, primary_lsn: Optional[str]) -> None:
+        try:
+            # таймаут на реплику: недоступная не задерживает замер остальных
+            lag = await asyncio.wait_for(self._probe(replica, primary_lsn), self.check_timeout)
+        except Exception as e:
+            if replica.lag is not None:
+                logger.warning("Replica %s is unavailable: %s", replica.name, e or type(e).__name__)
+            replica.lag = None
+            return
+        if lag is None and (replica.lag is not None or not replica.measured_at):
+            logger.warning("Replica %s lag is unknown (nothing replayed yet), reading from primary", replica.name)
+        elif lag > self.max_lag:
+            logger.warning("Replica %s lags %.1fs, reading from primary", replica.name, lag)
+        replica.lag, replica.measured_at = lag, time.monotonic()
+
+    async def check_lag(self) -> None:
+        primary_lsn = await self._primary_lsn()
+        await asyncio.gather(*(self._check_replica(r, primary_lsn) for r in self.replicas))
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "url": r.name,
+                "lag": r.current_lag(self.max_age),
+                "measured_ago": round(time.monotonic() - r.measured_at, 3) if r.measured_at else None,
+                "pool": r.engine.pool.stats(),
+            }
+            for r in self.replicas
+        ]
+
+
+def _create_replica_set() -> ReplicaSet:
+    replicas = [
+        Replica(create_pooled_engine(
+            url,
+            pool_size=settings.replica_pool_size,
+            max_overflow=settings.replica_max_overflow,
+        ))
+        for url in settings.replica_database_urls
+    ]
+    return ReplicaSet(
+        replicas, settings.replica_strategy, settings.replica_max_lag,
+        check_timeout=settings.replica_lag_check_timeout,
+        max_age=settings.replica_lag_max_age,
+    )
+
+
+replicas = _create_replica_set()
+
+
+async def watch_replicas(interval: float) -> None:
+    """ Периодический замер лага реплик; пока замера нет, чтение идёт с primary """
+    while True:
+        await replicas.check_lag()
+        await asyncio.sleep(interval)
+
+
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    Read-сессии внутри блока читают с primary. Нужен там, где результат переживает запрос:
+    запись кэша под новой версией тега, собранная на отстающей реплике, хранила бы старые строки весь TTL.
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+class _ReadSession(Session):
+    """ Источник выбирается при первом обращении к БД, а не при создании сессии в Depends """
+
+    _read_bind = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        # один раз на сессию: round_robin не должен разносить запросы по разным соединениям
+        if self._read_bind is None:
+            self._read_bind = (engine if _primary_reads.get() else replicas.pick()).sync_engine
+        return self._read_bind
+
+
+ReadSessionLocal = async_sessionmaker(
+    expire_on_commit=False, autoflush=False, autocommit=False,
+    class_=AsyncSession, sync_session_class=_ReadSession,
+)
+
+
+def read_session() -> AsyncSession:
+    """ Новая сессия для чтения (реплика или primary) — для кода вне Depends """
+    return ReadSessionLocal()
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """ Вариант get_async_session для read-only роутов """
+    async with read_session() as session:
+        yield session
@@ -0,0 +1,188 @@
+# src/fastapi_app/asyncdb/static.py
+"""
+"Статический" маппинг: SQLAlchemy Table строятся прямо из Django _meta,
+без reflection и вообще без обращения к БД.
+Покрывает FK/O2O, авто-M2M таблицы (core_item_categories), кастомные through (ItemTag),
+unique / unique_together / UniqueConstraint без условий.
+"""
+import hashlib
+
+from django.apps import apps as django_apps
+from django.conf import settings as django_settings
+from django.db import connection
+from django.db.models import UniqueConstraint as DjangoUniqueConstraint
+from sqlalchemy import (BigInteger, Boolean, Column, Date, DateTime, Float,
+                        ForeignKey, Integer, Interval, LargeBinary, MetaData,
+                        Numeric, SmallInteger, String, Table, Text, Time,
+                        UniqueConstraint)
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import NullType
+
+
+def _django_models():
+    """ Модели с реальными таблицами, включая авто-созданные through для M2M """
+    seen: set[str] = set()
+    for model in django_apps.get_models(include_auto_created=True):
+        opts = model._meta
+        if opts.proxy or opts.swapped or not opts.managed:
+            continue
+        if opts.db_table in seen:
+            continue
+        seen.add(opts.db_table)
+        yield model
+
+
+def _sa_type(field):
+    # FK/O2O: тип колонки = тип целевого поля (BigAutoField -> bigint и т.д.)
+    if field.is_relation and field.remote_field is not None and field.concrete:
+        return _sa_type(field.target_field)
+
+    internal = field.get_internal_type()
+    if internal in ("AutoField", "IntegerField", "PositiveIntegerField"):
+        return Integer()
+    if internal in ("BigAutoField", "BigIntegerField", "PositiveBigIntegerField"):
+        return BigInteger()
+    if internal in ("SmallAutoField", "SmallIntegerField", "PositiveSmallIntegerField"):
+        return SmallInteger()
+    if internal in ("CharField", "SlugField", "EmailField", "URLField", "FilePathField",
+                    "FileField", "ImageField"):
+        return String(field.max_length)
+    if internal == "TextField":
+        return Text()
+    if internal == "BooleanField":
+        return Boolean()
+    if internal == "DateTimeField":
+        return DateTime(timezone=django_settings.USE_TZ)
+    if internal == "DateField":
+        return Date()
+    if internal == "TimeField":
+        return Time()
+    if internal == "DurationField":
+        return Interval()
+    if internal == "DecimalField":
+        return Numeric(field.max_digits, field.decimal_places)
+    if internal == "FloatField":
+        return Float()
+    if internal == "UUIDField":
+        return postgresql.UUID(as_uuid=True)
+    if internal == "JSONField":
+        return postgresql.JSONB()
+    if internal == "BinaryField":
+        return LargeBinary()
+    if internal in ("GenericIPAddressField", "IPAddressField"):
+        return postgresql.INET()
+
+    # Фолбэк: DDL-тип Django -> тип диалекта postgresql (db_type не ходит в БД).
+    # db_parameters, а не db_type: у GeneratedField тип колонки — тип output_field
+    db_type = (field.db_parameters(connection)["type"] or "").split("(")[0].strip().lower()
+    type_cls = postgresql.base.ischema_names.get(db_type)
+    return type_cls() if type_cls is not None else NullType()
+
+
+def _unique_sets(opts) -> list[tuple[str, ...]]:
+    sets: list[tuple[str, ...]] = []
+    for fields in opts.unique_together:
+        sets.append(tuple(opts.get_field(f).column for f in fields))
+    for constraint in opts.constraints:
+        # частичные/функциональные unique в маппинге не нужны
+        if isinstance(constraint, DjangoUniqueConstraint) and constraint.fields and constraint.condition is None:
+            sets.append(tuple(opts.get_field(f).column for f in constraint.fields))
+    return sets
+
+
+def _table_for_model(model, md: MetaData) -> Table:
+    opts = model._meta
+    columns = []
+    for field in opts.local_concrete_fields:
+        args = []
+        if field.is_relation and field.remote_field is not None and field.db_constraint:
+            target = field.related_model._meta
+            args.append(ForeignKey(f"{target.db_table}.{field.target_field.column}"))
+        columns.append(Column(
+            field.column,
+            _sa_type(field),
+            *args,
+            primary_key=field.primary_key,
+            # GeneratedField Django создаёт без NOT NULL
+            nullable=(field.null or field.generated) and not field.primary_key,
+            unique=field.unique and not field.primary_key,
+        ))
+    constraints = [UniqueConstraint(*cols) for cols in _unique_sets(opts)]
+    return Table(opts.db_table, md, *columns, *constraints)
+
+
+def build_static_metadata() -> MetaData:
+    md = MetaData()
+    for model in _django_models():
+        _table_for_model(model, md)
+    return md
+
+
+def static_signature(md: MetaData) -> str:
+    """ Сигнатура схемы, посчитанная по самому MetaData (вместо django_migrations) """
+    digest = hashlib.sha256()
+    for name in sorted(md.tables):
+        table = md.tables[name]
+        digest.update(name.encode("utf-8") + b"(")
+        for col in table.columns:
+            fks = ",".join(sorted(fk.target_fullname for fk in col.foreign_keys))
+            digest.update(f"{col.name}:{col.type!r}:{col.nullable}:{col.primary_key}:{fks};".encode("utf-8"))
+        digest.update(b")")
+    return f"static:{digest.hexdigest()}"
+
+
+# ---------- parity check: static vs reflection ----------
+
+def _type_family(type_) -> str:
+    affinity = type_._type_affinity
+    return affinity.__name__ if affinity else type(type_).__name__
+
+
+def _describe(table: Table) -> dict:
+    return {
+        "columns": {
+            c.name: (_type_family(c.type), bool(c.nullable), bool(c.primary_key))
+            for c in table.columns
+        },
+        "fks": sorted(
+            (fk.parent.name, fk.column.table.name, fk.column.name)
+            for fk in table.foreign_keys
+        ),
+        "uniques": sorted(
+            {tuple(sorted(c.name for c in uc.columns))
+             for uc in table.constraints if isinstance(uc, UniqueConstraint)}
+            | {(c.name,) for c in table.columns if c.unique}
+        ),
+    }
+
+
+def compare_with_reflection(sync_conn) -> list[str]:
+    """
+    Сравнивает статический MetaData с отражённым из БД.
+    Возвращает список расхождений (пустой — маппинги эквивалентны).
+    """
+    static_md = build_static_metadata()
+    existing = set(sa_inspect(sync_conn).get_table_names(schema=None))
+    diffs: list[str] = []
+
+    missing = sorted(set(static_md.tables) - existing)
+    diffs.extend(f"{name}: table is missing in database" for name in missing)
+
+    common = sorted(set(static_md.tables) & existing)
+    reflected = MetaData()
+    reflected.reflect(bind=sync_conn, only=common)
+
+    for name in common:
+        static_desc = _describe(static_md.tables[name])
+        db_desc = _describe(reflected.tables[name])
+
+        for col in sorted(set(static_desc["columns"]) | set(db_desc["columns"])):
+            s, d = static_desc["columns"].get(col), db_desc["columns"].get(col)
+            if s != d:
+                diffs.append(f"{name}.{col}: static={s} reflected={d}")
+        if static_desc["fks"] != db_desc["fks"]:
+            diffs.append(f"{name}: fks static={static_desc['fks']} reflected={db_desc['fks']}")
+        if static_desc["uniques"] != db_desc["uniques"]:
+            diffs.append(f"{name}: uniques static={static_desc['uniques']} reflected={db_desc['uniques']}")
+    return diffs
@@ -0,0 +1,359 @@
+# src/fastapi_app/core/cache.py
+"""
+Кэш ответов read-роутов в Redis.
+Ключ = путь + query + версии тегов. Тег — db_table модели; Django при изменении строк
+делает INCR версии тега (apps/core/signals.py), старые ключи перестают читаться и доживают TTL.
+Stampede: пересчёт ключа делает один запрос (lock SET NX), остальные ждут его результат;
+незадолго до истечения TTL один запрос пересчитывает значение, остальные отдают текущее.
+
+Перед Redis — локальный слой воркера: версии тегов (обновляются через Redis pub/sub,
+Django публикует новую версию после INCR) и LRU+TTL для маленьких горячих ответов (local=True).
+
+Новую запись (MISS — в том числе первую после смены версии тега) считаем на primary: отстающая
+реплика положила бы старые строки под новую версию. REFRESH той же версии читает с реплики.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from fastapi import Request, Response
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from ..asyncdb.replicas import primary_reads
+from ..settings.config import settings
+from .responses import json_response
+
+logger = logging.getLogger("logger")
+
+# Префикс версий тегов и канал их обновлений — те же в apps/core/signals.py
+TAG_VERSION_PREFIX = "cache:tag:"
+KEY_PREFIX = "cache:resp:"
+LOCK_PREFIX = "cache:lock:"
+
+CACHE_HEADER = "X-Cache"
+# Не кэшируем заголовки, которые зависят от конкретного ответа
+_SKIP_HEADERS = {"content-length", CACHE_HEADER.lower()}
+
+_redis: Optional[Redis] = None
+
+
+class LocalCache:
+    """ LRU + TTL в памяти воркера. Без блокировок: всё выполняется в одном event loop """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+local_cache = LocalCache(settings.cache_local_maxsize, settings.cache_local_ttl)
+
+# Версии тегов, известные воркеру: tag -> (версия, когда получена).
+# Pub/sub обновляет их сразу; cache_version_ttl — страховка на время обрыва подписки.
+_versions: dict[str, tuple[int, float]] = {}
+
+
+def get_redis() -> Optional[Redis]:
+    """ Общий клиент Redis воркера; None — кэш выключен (FASTAPI_REDIS_URL не задан) """
+    global _redis
+    if _redis is None and settings.redis_url:
+        _redis = Redis.from_url(settings.redis_url, socket_timeout=settings.cache_redis_timeout)
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def cache_tag(target: Any) -> str:
+    """ Тег = db_table модели (или строка как есть) """
+    return target if isinstance(target, str) else target._meta.db_table
+
+
+def _set_version(tag: str, version: int, now: float) -> None:
+    # версии только растут: ответ MGET, ушедшего до PUBLISH, не откатывает новую версию
+    known = _versions.get(tag)
+    _versions[tag] = (max(version, known[0]) if known else version, now)
+
+
+async def tag_versions(redis: Redis, tags: tuple[str, ...]) -> str:
+    now = time.monotonic()
+    known = [_versions.get(t) for t in tags]
+    if any(k is None or now - k[1] >= settings.cache_version_ttl for k in known):
+        values = await redis.mget([TAG_VERSION_PREFIX + t for t in tags])
+        for tag, value in zip(tags, values):
+            _set_version(tag, int(value) if value else 0, now)
+    return ".".join(str(_versions[t][0]) for t in tags)
+
+
+async def listen_cache_tags(channel: str) -> None:
+    """
+    Подписка на новые версии тегов (Django: PUBLISH "<tag>=<version>").
+    Отдельный клиент без socket_timeout: соединение подолгу ждёт сообщений.
+    """
+    backoff = 1.0
+    while True:
+        client = Redis.from_url(settings.redis_url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            # пока подписки не было, сообщения могли потеряться — перечитаем версии из Redis
+            _versions.clear()
+            backoff = 1.0
+            while True:
+                message = await pubsub.get_message(timeout=30.0)
+                if message is None:
+                    await pubsub.ping()
+                    continue
+                tag, _, version = message["data"].decode().partition("=")
+                if version:
+                    _set_version(tag, int(version), time.monotonic())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache tags subscription lost: %s", e)
+        finally:
+            with suppress(Exception):
+                await pubsub.aclose()
+                await client.aclose()
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+async def bump_tags(tags: set[str]) -> None:
+    """ Инвалидация после записи из самого FastAPI — как bump_cache_tags в apps/core/signals.py """
+    redis = get_redis()
+    if redis is None:
+        return
+    tags = sorted(tags)
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(TAG_VERSION_PREFIX + tag)
+            versions = await pipe.execute()
+        async with redis.pipeline(transaction=False) as pipe:
+            for tag, version in zip(tags, versions):
+                pipe.publish(settings.cache_tags_channel, f"{tag}={version}")
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Failed to invalidate cache tags %s: %s", tags, e)
+        return
+    now = time.monotonic()
+    for tag, version in zip(tags, versions):
+        _set_version(tag, version, now)
+
+
+def _request_key(request: Request) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return hashlib.sha1(f"{request.url.path}?{query}".encode("utf-8")).hexdigest()
+
+
+# ---------- формат записи: json-заголовок + "\n" + тело ----------
+
+def _entry_headers(response: Response) -> dict:
+    return {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS}
+
+
+def _dump_entry(response: Response, refresh_at: float) -> bytes:
+    meta = orjson.dumps({"s": response.status_code, "h": _entry_headers(response), "r": refresh_at})
+    return meta + b"\n" + bytes(response.body)
+
+
+def _load_entry(raw: bytes) -> tuple[Response, float]:
+    meta, _, body = raw.partition(b"\n")
+    data = orjson.loads(meta)
+    return Response(content=body, status_code=data["s"], headers=data["h"]), data["r"]
+
+
+def _as_response(result: Any) -> Response:
+    return result if isinstance(result, Response) else json_response(result)
+
+
+async def _store(redis: Redis, key: str, response: Response, ttl: float) -> None:
+    if response.status_code != 200 or not hasattr(response, "body"):
+        return
+    refresh_at = time.time() + ttl * (1 - settings.cache_early_recompute)
+    await redis.set(key, _dump_entry(response, refresh_at), px=int(ttl * 1000))
+
+
+async def _lock(redis: Redis, key: str) -> bool:
+    return bool(await redis.set(LOCK_PREFIX + key, 1, nx=True, px=int(settings.cache_lock_timeout * 1000)))
+
+
+async def _compute_and_store(redis: Redis, key: str, ttl: float, compute, primary: bool) -> Response:
+    """ Вызывается владельцем lock'а; ошибки Redis здесь уже не мешают ответу """
+    try:
+        if primary:
+            with primary_reads():
+                response = await compute()
+        else:
+            response = await compute()
+        try:
+            await _store(redis, key, response, ttl)
+        except RedisError as e:
+            logger.warning("Failed to store cached response: %s", e)
+        return response
+    finally:
+        with suppress(RedisError):
+            await redis.delete(LOCK_PREFIX + key)
+
+
+async def _wait_for_entry(redis: Redis, key: str) -> Optional[bytes]:
+    """ Ждём, пока пересчёт в другом запросе/воркере положит значение """
+    deadline = time.monotonic() + settings.cache_lock_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.cache_wait_interval)
+        raw = await redis.get(key)
+        if raw is not None:
+            return raw
+    return None
+
+
+def _tagged(response: Response, status: str) -> Response:
+    response.headers[CACHE_HEADER] = status
+    return response
+
+
+def _store_local(key: str, response: Response) -> Response:
+    if response.status_code == 200 and hasattr(response, "body"):
+        local_cache.set(key, (_entry_headers(response), bytes(response.body)))
+    return response
+
+
+async def cache_response(
+    request: Request,
+    tags: tuple[str, ...],
+    ttl: float,
+    compute: Callable[[], Awaitable[Response]],
+    local: bool = False,
+) -> Response:
+    redis = get_redis()
+    if redis is None:
+        return await compute()
+
+    try:
+        key = f"{KEY_PREFIX}{_request_key(request)}:{await tag_versions(redis, tags)}"
+    except RedisError as e:
+        # Redis недоступен — отвечаем без кэша, роут не должен падать
+        logger.warning("Response cache is unavailable: %s", e)
+        return await compute()
+
+    if local:
+        entry = local_cache.get(key)
+        if entry is not None:
+            headers, body = entry
+            return _tagged(Response(content=body, headers=headers), "LOCAL")
+        return _store_local(key, await _cache_response_shared(redis, key, ttl, compute))
+    return await _cache_response_shared(redis, key, ttl, compute)
+
+
+async def _cache_response_shared(redis: Redis, key: str, ttl: float, compute) -> Response:
+    """ Общий кэш в Redis (HIT / MISS / REFRESH) """
+    try:
+        raw = await redis.get(key)
+        if raw is not None:
+            response, refresh_at = _load_entry(raw)
+            # ранний пересчёт: первый, кто взял lock, обновляет запись, остальные отдают текущую
+            if time.time() < refresh_at or not await _lock(redis, key):
+                return _tagged(response, "HIT")
+            owner, status = True, "REFRESH"
+        else:
+            owner, status = await _lock(redis, key), "MISS"
+            if not owner:
+                raw = await _wait_for_entry(redis, key)
+                if raw is not None:
+                    return _tagged(_load_entry(raw)[0], "HIT")
+    except RedisError as e:
+        # Redis недоступен — отвечаем без кэша, роут не должен падать
+        logger.warning("Response cache is unavailable: %s", e)
+        return await compute()
+
+    if owner:
+        return _tagged(await _compute_and_store(redis, key, ttl, compute, primary=status == "MISS"), status)
+    # пересчёт в другом месте не уложился в cache_lock_timeout — считаем сами, не сохраняя
+    return _tagged(await compute(), status)
+
+
+def cached(*targets: Any, ttl: Optional[float] = None, local: bool = False):
+    """
+    Декоратор read-роута: @router.get(...) сверху, @cached(Item, Supplier) под ним.
+    targets — модели Django (или имена таблиц), изменения которых инвалидируют ответ.
+    local=True — ещё и LRU воркера (для маленьких горячих ответов: справочники).
+    Если у роута нет параметра request, он добавляется в сигнатуру для FastAPI.
+    """
+    tags = tuple(sorted({cache_tag(t) for t in targets}))
+
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        has_request = "request" in signature.parameters
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs["request"] if has_request else kwargs.pop("request")
+
+            async def compute() -> Response:
+                return _as_response(await endpoint(*args, **kwargs))
+
+            return await cache_response(request, tags, ttl or settings.cache_ttl, compute, local=local)
+
+        if not has_request:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ])
+        return wrapper
+    return decorator
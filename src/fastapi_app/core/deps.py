@@ -1,5 +1,26 @@
 
-from fastapi import Query
+import base64
+import hashlib
+import hmac
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import Header, HTTPException, Query
+
+from ..settings.config import settings
+
+
+# Служебные эндпоинты (/_internal/*, загрузка фидов): заголовок X-Internal-Token
+INTERNAL_TOKEN = os.getenv("FASTAPI_REFRESH_TOKEN", "")
+
+
+def require_internal_token(x_internal_token: str = Header(default="")) -> None:
+    """ Без FASTAPI_REFRESH_TOKEN служебные эндпоинты закрыты для всех """
+    if not INTERNAL_TOKEN or not hmac.compare_digest(x_internal_token.encode(), INTERNAL_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
 
 
 def pagination_params(
@@ -7,3 +28,102 @@ def pagination_params(
     offset: int = Query(0, ge=0),
 ) -> tuple[int, int]:
     return limit, offset
+
+
+# ---------- Keyset (cursor) pagination ----------
+# Курсор — это ключ сортировки последней строки страницы, например (created_at, id),
+# упакованный в base64 и подписанный HMAC, чтобы клиент не мог подсунуть произвольный ключ.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def cursor_secret() -> bytes:
+    """ FASTAPI_CURSOR_SECRET или SECRET_KEY; без секрета приложение не стартует (create_app) """
+    secret = settings.cursor_secret or os.getenv("SECRET_KEY", "")
+    if not secret:
+        raise RuntimeError("Cursor signing secret is not configured: set FASTAPI_CURSOR_SECRET or SECRET_KEY")
+    return secret.encode("utf-8")
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(cursor_secret(), payload, hashlib.sha256).digest()[:16]
+
+
+def _dump_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    return v
+
+
+def _load_value(v: Any) -> Any:
+    if isinstance(v, dict) and "dt" in v:
+        return datetime.fromisoformat(v["dt"])
+    return v
+
+
+def _check_value(v: Any, t: type) -> Any:
+    # bool — подкласс int, но в ключах сортировки не встречается
+    if isinstance(v, bool) or not isinstance(v, (int, float) if t is float else t):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(v) if t is float else v
+
+
+def encode_cursor(scope: str, *key: Any) -> str:
+    """ scope — имя keyset-statement'а: курсор действителен только для него """
+    payload = json.dumps([scope, [_dump_value(v) for v in key]], separators=(",", ":")).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(token: str) -> tuple[str, tuple]:
+    """ -> (scope, ключ) """
+    try:
+        body, sig = token.split(".", 1)
+        payload = _b64decode(body)
+        if not hmac.compare_digest(_sign(payload), _b64decode(sig)):
+            raise ValueError("bad signature")
+        scope, values = json.loads(payload)
+        if not isinstance(scope, str) or not isinstance(values, list):
+            raise ValueError("bad payload")
+        return scope, tuple(_load_value(v) for v in values)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@dataclass(frozen=True)
+class CursorPage:
+    limit: int
+    after: Optional[tuple] = None  # ключ последней строки предыдущей страницы
+    scope: Optional[str] = None  # statement, для которого курсор выдан
+
+    def key(self, scope: str, *types: type) -> Optional[tuple]:
+        """ Ключ с проверкой scope и типов значений (курсор от другого роута -> 400, а не 500) """
+        if self.after is None:
+            return None
+        if self.scope != scope or len(self.after) != len(types):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return tuple(_check_value(v, t) for v, t in zip(self.after, types))
+
+    def next_cursor(self, rows: list, scope: str, *key_names: str) -> Optional[str]:
+        """ Курсор на следующую страницу или None, если страница неполная (дальше пусто) """
+        if len(rows) < self.limit:
+            return None
+        last = rows[-1]
+        return encode_cursor(scope, *(last[name] for name in key_names))
+
+
+def cursor_pagination_params(
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Значение заголовка X-Next-Cursor предыдущей страницы"),
+) -> CursorPage:
+    if not cursor:
+        return CursorPage(limit=limit)
+    scope, after = decode_cursor(cursor)
+    return CursorPage(limit=limit, after=after, scope=scope)
@@ -1,14 +1,36 @@
-from fastapi import FastAPI
+import hashlib
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Depends, FastAPI, Request, Response
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from ..asyncdb.replicas import read_session
 from ..settings.config import Settings
+from .cache import cache_tag, get_redis, tag_versions
+from .deps import NEXT_CURSOR_HEADER
 from .django_init import ensure_django_initialized
 
+# request.state, куда conditional_get кладёт ETag/Last-Modified для ответа 200
+_VALIDATORS_STATE = "conditional_validators"
+
+# Время последнего изменения данных роута (None — неизвестно); читается отдельной read-сессией
+LastModified = Callable[[AsyncSession], Awaitable[Optional[datetime]]]
+
 
 def install_middlewares(app: FastAPI, settings: Settings):
     # Инициализация Django один раз при старте
     ensure_django_initialized(settings.django_settings_module)
 
+    # Conditional GET: 304 из зависимости conditional_get, ETag/Last-Modified на 200
+    app.add_middleware(ConditionalHeadersMiddleware)
+    app.add_exception_handler(NotModified, _not_modified_handler)
+
     # CORS
     if settings.cors_origins:
         app.add_middleware(
@@ -17,4 +39,115 @@ def install_middlewares(app: FastAPI, settings: Settings):
             allow_methods=["*"],
             allow_headers=["*"],
             allow_credentials=True,
+            expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
         )
+
+
+# ---------- Conditional GET (ETag / Last-Modified / 304) ----------
+
+class NotModified(Exception):
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+async def _not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+class ConditionalHeadersMiddleware:
+    """ Проставляет ETag/Last-Modified, посчитанные conditional_get, на ответ 200 """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_validators(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                validators = scope.get("state", {}).get(_VALIDATORS_STATE)
+                if validators:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in validators.items():
+                        headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+
+def _http_date(value: datetime) -> str:
+    # HTTP-дата — с точностью до секунды: округляем вверх, иначе изменение в ту же секунду
+    # после отданного Last-Modified дало бы 304 по If-Modified-Since
+    if value.microsecond:
+        value = value.replace(microsecond=0) + timedelta(seconds=1)
+    return format_datetime(value, usegmt=True)
+
+
+async def _validators(
+    request: Request, tags: tuple[str, ...], last_modified: Optional[LastModified],
+) -> Optional[dict]:
+    parts: list[Any] = [request.url.path, sorted(request.query_params.multi_items())]
+    validators = {}
+
+    modified_at = None
+    if last_modified is not None:
+        async with read_session() as session:
+            modified_at = await last_modified(session)
+        if modified_at is not None:
+            parts.append(modified_at.isoformat())
+            validators["Last-Modified"] = _http_date(modified_at)
+
+    redis = get_redis()
+    if redis is not None:
+        try:
+            # версии меняются на каждую запись (и удаление) — запрос в БД не нужен
+            parts.append(await tag_versions(redis, tags))
+        except RedisError:
+            return None
+    elif modified_at is None:
+        # без версий тегов и без времени изменения дешёвого валидатора нет — conditional GET выключен
+        return None
+
+    etag = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    validators["ETag"] = f'W/"{etag}"'
+    return validators
+
+
+def _not_modified(request: Request, validators: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match важнее If-Modified-Since; слабое сравнение
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"].removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in validators:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(validators["Last-Modified"]) <= since
+    return False
+
+
+def conditional_get(*targets: Any, last_modified: Optional[LastModified] = None):
+    """
+    Зависимость для read-роутов: dependencies=[conditional_get(Item, Supplier)].
+    ETag = путь + query + версии тегов (см. core/cache.py). last_modified — только там, где у данных
+    есть честное время изменения (refreshed_at у core_item_summary): даёт Last-Modified / If-Modified-Since
+    и ETag без Redis. Без Redis и без last_modified conditional GET выключен.
+    Совпал валидатор — 304 сразу, до основного запроса и кэша.
+    """
+    tags = tuple(sorted({cache_tag(t) for t in targets}))
+
+    async def dependency(request: Request):
+        validators = await _validators(request, tags, last_modified)
+        if validators is None:
+            return
+        if _not_modified(request, validators):
+            raise NotModified(validators)
+        setattr(request.state, _VALIDATORS_STATE, validators)
+
+    return Depends(dependency)
@@ -0,0 +1,48 @@
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+
+import orjson
+from asyncpg import Record
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..settings.config import Settings, settings
+
+
+def _orjson_default(obj):
+    # datetime/date/UUID/dataclass orjson сериализует сам — сюда попадает остальное
+    if isinstance(obj, Record):
+        return dict(obj)
+    if isinstance(obj, BaseModel):
+        # уже провалидированная модель: только dump, без повторной валидации
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON через orjson. Принимает dict/list, pydantic-модели и asyncpg.Record как есть;
+    если вернуть его из роута — jsonable_encoder не вызывается вовсе.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default)
+
+
+def get_response_class(s: Settings = settings) -> type[JSONResponse]:
+    """ default_response_class для create_app(): orjson или стандартный JSONResponse FastAPI """
+    return ORJSONResponse if s.json_encoder == "orjson" else JSONResponse
+
+
+def json_response(
+    content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None,
+) -> JSONResponse:
+    """
+    Готовый ответ из роута. orjson — сериализация за один проход;
+    default — прежнее поведение FastAPI (jsonable_encoder + JSONResponse).
+    """
+    if settings.json_encoder == "orjson":
+        return ORJSONResponse(content, status_code=status_code, headers=headers)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
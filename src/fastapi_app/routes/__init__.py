@@ -2,13 +2,21 @@ from fastapi import APIRouter, FastAPI
 
 from ..settings.config import Settings
 from .admin_internal import router as admin_internal_router
+from .export import router as export_router
 from .health import router as health_router
+from .ingest import router as ingest_router
 from .items import router as items_router
+from .orders import router as orders_router
+from .summary import router as summary_router
 
 
 def include_all_routers(app: FastAPI, settings: Settings):
     api = APIRouter(prefix=settings.api_prefix)
     api.include_router(health_router, tags=["health"])
     api.include_router(items_router, tags=["items"])
+    api.include_router(export_router, tags=["items"])
+    api.include_router(ingest_router, tags=["items"])
+    api.include_router(orders_router, tags=["orders"])
+    api.include_router(summary_router, tags=["summary"])
     api.include_router(admin_internal_router, tags=["internal"])
     app.include_router(api)
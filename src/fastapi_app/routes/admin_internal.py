@@ -1,19 +1,47 @@
 # src/fastapi_app/routes/admin_internal.py
-import os
-
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Depends
 
 from ..asyncdb.auto import refresh_mapping
+from ..asyncdb.engine import engine
+from ..asyncdb.replicas import replicas
+from ..asyncdb.static import compare_with_reflection
+from ..core.cache import local_cache
+from ..core.deps import require_internal_token
 
-router = APIRouter()
-
-INTERNAL_TOKEN = os.getenv("FASTAPI_REFRESH_TOKEN", "")
+router = APIRouter(dependencies=[Depends(require_internal_token)])
 
 
 @router.post("/_internal/refresh-mapping")
-async def internal_refresh_mapping(x_internal_token: str = Header(default="")):
+async def internal_refresh_mapping():
     """ Эндпоинт для после применения миграций на Django """
-    if not INTERNAL_TOKEN or x_internal_token != INTERNAL_TOKEN:
-        raise HTTPException(status_code=403, detail="Forbidden")
     await refresh_mapping(force=True)
     return {"status": "refreshed"}
+
+
+@router.get("/_internal/mapping-parity")
+async def internal_mapping_parity():
+    """ Сверка static-маппинга (Django _meta) с reflection реальной БД """
+    async with engine.connect() as conn:
+        diffs = await conn.run_sync(compare_with_reflection)
+    return {"ok": not diffs, "diffs": diffs}
+
+
+@router.get("/_internal/replicas")
+async def internal_replicas():
+    """ Лаг и загрузка пулов реплик (lag=null — реплика сейчас не используется) """
+    return {"strategy": replicas.strategy, "max_lag": replicas.max_lag, "replicas": replicas.stats()}
+
+
+@router.get("/_internal/pool-stats")
+async def internal_pool_stats():
+    """ Живая статистика пулов этого воркера: занято/overflow/ожидание соединения """
+    return {
+        "primary": engine.pool.stats(),
+        "replicas": {r.name: r.engine.pool.stats() for r in replicas.replicas},
+    }
+
+
+@router.get("/_internal/cache-stats")
+async def internal_cache_stats():
+    """ Счётчики локального LRU этого воркера (hit/miss/eviction) — для подбора размера и TTL """
+    return {"local": local_cache.stats()}
@@ -0,0 +1,98 @@
+# src/fastapi_app/routes/export.py
+"""
+Потоковый экспорт core_item (+ supplier, categories, tags) в NDJSON/CSV.
+Строки читаются серверным курсором (session.stream + yield_per) и отдаются
+чанками через StreamingResponse — память не растёт с размером таблицы.
+"""
+import csv
+import io
+import logging
+from typing import AsyncIterator, Literal
+
+import orjson
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from apps.core.models import Item, Supplier
+
+from ..asyncdb.auto import get_statement, register_statement
+from ..asyncdb.replicas import read_session
+from ..settings.config import settings
+from .items import item_categories_agg, item_tags_agg
+
+logger = logging.getLogger("logger")
+
+router = APIRouter()
+
+CSV_COLUMNS = ("id", "name", "created_at", "supplier", "categories", "tags")
+
+
+# Одна строка на item: категории и теги — те же jsonb_agg-подзапросы, что и у /demo/items_nested
+@register_statement("items.export")
+def _items_export_stmt(m):
+    SAItem = m.mapped(Item)
+    SASupplier = m.mapped(Supplier)
+    return (
+        select(
+            SAItem.id,
+            SAItem.name,
+            SAItem.created_at,
+            SASupplier.name.label("supplier"),
+            item_categories_agg(m, SAItem).label("categories"),
+            item_tags_agg(m, SAItem).label("tags"),
+        )
+        .select_from(SAItem.__table__.outerjoin(SASupplier.__table__, SAItem.supplier_id == SASupplier.id))
+        .order_by(SAItem.id)
+    )
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def _csv_chunk(rows) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow((
+            row["id"],
+            row["name"],
+            row["created_at"].isoformat(),
+            row["supplier"] or "",
+            "|".join(c["title"] for c in row["categories"]),
+            "|".join(f"{t['title']}:{t['weight']}" for t in row["tags"]),
+        ))
+    return buf.getvalue().encode("utf-8")
+
+
+async def _stream_items(fmt: str, chunk_rows: int) -> AsyncIterator[bytes]:
+    """
+    Сессия открывается внутри генератора: yield-зависимости FastAPI закрываются
+    до того, как StreamingResponse начнёт отдавать тело.
+    Следующий чанк читается из курсора только после того, как предыдущий ушёл клиенту.
+    """
+    encode = _ndjson_chunk if fmt == "ndjson" else _csv_chunk
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf).writerow(CSV_COLUMNS)
+        yield buf.getvalue().encode("utf-8")
+
+    async with read_session() as session:
+        stmt = get_statement("items.export").execution_options(yield_per=chunk_rows)
+        result = await session.stream(stmt)
+        try:
+            async for rows in result.mappings().partitions():
+                yield encode(rows)
+        finally:
+            await result.close()
+
+
+@router.get("/demo/items/export")
+async def demo_items_export(format: Literal["ndjson", "csv"] = Query("ndjson")):
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        _stream_items(format, settings.export_chunk_rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
@@ -0,0 +1,49 @@
+# src/fastapi_app/routes/ingest.py
+"""
+Массовая загрузка items (фиды поставщиков): NDJSON/CSV в теле запроса.
+Строки идут в staging-таблицы через asyncpg COPY, дальше set-wise SQL — см. apps/core/ingest.py.
+Тот же путь для файлов — Celery-задача apps.core.tasks.ingest_items_feed.
+"""
+import logging
+import time
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from apps.core.ingest import TOUCHED_TABLES, IngestError, ingest_async, parse
+
+from ..asyncdb.engine import engine
+from ..core.cache import bump_tags
+from ..core.deps import require_internal_token
+from ..schemas.ingest import IngestResult
+
+logger = logging.getLogger("logger")
+
+router = APIRouter()
+
+
+@router.post(
+    "/demo/items/ingest", response_model=IngestResult, dependencies=[Depends(require_internal_token)],
+)
+async def demo_items_ingest(request: Request, format: Literal["ndjson", "csv"] = Query("ndjson")):
+    """ Upsert items по external_id; M2M items из фида заменяются присланными """
+    started = time.monotonic()
+    try:
+        # парсинг большого фида — CPU, не держим event loop
+        batch = await run_in_threadpool(parse, await request.body(), format)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IngestError as e:
+        # строка фида не прошла FeedRow (типы, длины) — до COPY в БД
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # запись — только primary; транзакцию ведёт сам asyncpg (ingest_async)
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        result = await ingest_async(raw.driver_connection, batch)
+
+    await bump_tags(TOUCHED_TABLES)
+    result["seconds"] = round(time.monotonic() - started, 3)
+    logger.info("Ingested items feed: %s", result)
+    return result
@@ -1,126 +1,493 @@
 import logging
+from datetime import datetime
+from itertools import product
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, join, select
+from sqlalchemy import (BigInteger, Float, Integer, String, any_, bindparam,
+                        case, cast, func, join, literal_column, null, or_,
+                        select, tuple_, union_all)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from apps.core.models import (Category, Item, ItemTag, Order, OrderItem,
-                              Supplier, Tag)
+from apps.core.models import Category, Item, ItemTag, Supplier, Tag
+from apps.core.search import SEARCH_CONFIG, prefix_tsquery
 
-from ..asyncdb.auto import get_mapped_class, state
-from ..asyncdb.engine import get_async_session
+from ..asyncdb.auto import get_statement, register_statement
+from ..asyncdb.engine import fetch_records
+from ..asyncdb.replicas import get_async_read_session
+from ..core.cache import cached
+from ..core.deps import (NEXT_CURSOR_HEADER, CursorPage,
+                         cursor_pagination_params)
+from ..core.middlewares import conditional_get
+from ..core.responses import json_response
+from ..schemas.items import ItemOut
+from ..settings.config import settings
 
 logger = logging.getLogger("logger")
 
 router = APIRouter()
 
 
+def _keyset(stmt, after: bool, *cols):
+    """
+    Keyset-пагинация: ORDER BY cols DESC + WHERE (cols) < (:k0, :k1, ...) + LIMIT :limit.
+    Для (created_at, id) работает по индексу core_item_created_id_idx без OFFSET.
+    """
+    if after:
+        stmt = stmt.where(tuple_(*cols) < tuple_(*(
+            bindparam(f"k{i}", type_=c.type) for i, c in enumerate(cols)
+        )))
+    return stmt.order_by(*(c.desc() for c in cols)).limit(bindparam("limit", type_=Integer))
+
+
+def _register_keyset_statement(name: str):
+    """
+    Регистрирует два варианта statement'а: первая страница (name) и следующие (name:after).
+    builder(snapshot, after) -> statement; параметры — см. _page_statement.
+    """
+    def decorator(builder):
+        register_statement(name)(lambda snap: builder(snap, False))
+        register_statement(f"{name}:after")(lambda snap: builder(snap, True))
+        return builder
+    return decorator
+
+
+# Типы значений ключа сортировки — курсор проверяется по ним до похода в БД
+_BY_CREATED = (datetime, int)  # (created_at, id)
+_BY_CREATED_CHILD = (datetime, int, int)  # (created_at, id, id связанной строки)
+_BY_RANK = (float, int)  # (rank, id)
+
+
+def _cursor_scope(name: str) -> str:
+    """ Курсор привязан к statement'у; варианты фасетов ("items.facets:tag") — к общему имени """
+    return name.split(":", 1)[0]
+
+
+def _page_statement(name: str, page: CursorPage, key_types: tuple):
+    key = page.key(_cursor_scope(name), *key_types)
+    params = {"limit": page.limit}
+    if key is None:
+        return get_statement(name), params
+    params.update({f"k{i}": v for i, v in enumerate(key)})
+    return get_statement(f"{name}:after"), params
+
+
+async def _fetch_page(session: AsyncSession, name: str, page: CursorPage, key_types: tuple, **extra) -> list:
+    """ extra — параметры statement'а помимо ключа и limit """
+    stmt, params = _page_statement(name, page, key_types)
+    params.update(extra)
+    if settings.raw_fast_path:
+        return await fetch_records(session, stmt, params)
+    return [dict(r) for r in (await session.execute(stmt, params)).mappings()]
+
+
+def _page_response(page: CursorPage, name: str, rows: list, *key_names: str):
+    """ Ответ со строками страницы (dict или asyncpg.Record) и заголовком X-Next-Cursor """
+    cursor = page.next_cursor(rows, _cursor_scope(name), *key_names)
+    return json_response(rows, headers={NEXT_CURSOR_HEADER: cursor} if cursor else None)
+
+
 # 1) Простой список items (SELECT ... FROM core_item)
-@router.get("/demo/items")
+@_register_keyset_statement("items.list")
+def _items_list_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    return _keyset(
+        select(SAItem.id, SAItem.name, SAItem.created_at),
+        after, SAItem.created_at, SAItem.id,
+    )
+
+
+@router.get("/demo/items", response_model=list[ItemOut], dependencies=[conditional_get(Item)])
+@cached(Item)
 async def demo_items(
-    limit: int = Query(20, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    session: AsyncSession = Depends(get_async_session),
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
-    SAItem = get_mapped_class(Item)
-    stmt = (
-        select(SAItem.id, SAItem.name, SAItem.created_at)
-        .order_by(SAItem.created_at.desc())
-        .limit(limit).offset(offset)
-    )
-    rows = (await session.execute(stmt)).mappings().all()
-    return [dict(r) for r in rows]
+    rows = await _fetch_page(session, "items.list", page, _BY_CREATED)
+    return _page_response(page, "items.list", rows, "created_at", "id")
 
 
 # 2) JOIN: items + supplier (FK)
-@router.get("/demo/items_with_supplier")
-async def demo_items_with_supplier(
-    limit: int = 20,
-    session: AsyncSession = Depends(get_async_session),
-):
-    SAItem = get_mapped_class(Item)
-    SASupplier = get_mapped_class(Supplier)
+@_register_keyset_statement("items.with_supplier")
+def _items_with_supplier_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    SASupplier = m.mapped(Supplier)
 
     j = join(SAItem, SASupplier, SAItem.supplier_id == SASupplier.id)
-    stmt = select(
-        SAItem.id.label("item_id"),
-        SAItem.name.label("item_name"),
-        SASupplier.name.label("supplier"),
-    ).select_from(j).limit(limit)
+    return _keyset(
+        select(
+            SAItem.id.label("item_id"),
+            SAItem.name.label("item_name"),
+            SAItem.created_at,
+            SASupplier.name.label("supplier"),
+        ).select_from(j),
+        after, SAItem.created_at, SAItem.id,
+    )
 
-    rows = (await session.execute(stmt)).mappings().all()
-    return [dict(r) for r in rows]
+
+@router.get("/demo/items_with_supplier", dependencies=[conditional_get(Item, Supplier)])
+@cached(Item, Supplier)
+async def demo_items_with_supplier(
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    rows = await _fetch_page(session, "items.with_supplier", page, _BY_CREATED)
+    return _page_response(page, "items.with_supplier", rows, "created_at", "item_id")
 
 
 # 3) M2M (авто-таблица через ManyToManyField): items + categories
-@router.get("/demo/items_categories")
-async def demo_items_categories(
-    limit: int = 50,
-    session: AsyncSession = Depends(get_async_session),
-):
-    SAItem = get_mapped_class(Item)
-    SACategory = get_mapped_class(Category)
+@_register_keyset_statement("items.categories")
+def _items_categories_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    SACategory = m.mapped(Category)
 
     # automap создаёт secondary таблицу с именем типа core_item_categories (зависит от Django)
     # безопаснее сделать manual join через реальную m2m таблицу имени:
     # Django автогенерит <app>_<model>_<field> например: core_item_categories
     # Узнать имя можно так:
     m2m_table_name = Item._meta.get_field("categories").m2m_db_table()
-    # достаём secondary как Table из metadata
-    secondary = state.metadata.tables[m2m_table_name]
+    # достаём secondary как Table из metadata этой версии маппинга
+    secondary = m.metadata.tables[m2m_table_name]
 
     j = (SAItem.__table__
          .join(secondary, SAItem.id == secondary.c.item_id)
          .join(SACategory.__table__, SACategory.id == secondary.c.category_id))
 
-    stmt = select(
-        SAItem.id.label("item_id"),
-        SAItem.name.label("item_name"),
-        SACategory.id.label("category_id"),
-        SACategory.title.label("category"),
-    ).select_from(j).limit(limit)
+    # строк несколько на один item, поэтому в ключ добавляем id категории
+    return _keyset(
+        select(
+            SAItem.id.label("item_id"),
+            SAItem.name.label("item_name"),
+            SAItem.created_at,
+            SACategory.id.label("category_id"),
+            SACategory.title.label("category"),
+        ).select_from(j),
+        after, SAItem.created_at, SAItem.id, SACategory.id,
+    )
+
 
-    rows = (await session.execute(stmt)).mappings().all()
-    return [dict(r) for r in rows]
+@router.get(
+    "/demo/items_categories",
+    dependencies=[conditional_get(Item, Category, Item.categories.through)],
+)
+@cached(Item, Category, Item.categories.through)
+async def demo_items_categories(
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    rows = await _fetch_page(session, "items.categories", page, _BY_CREATED_CHILD)
+    return _page_response(page, "items.categories", rows, "created_at", "item_id", "category_id")
 
 
 # 4) M2M через кастомный through (ItemTag + extra field 'weight')
-@router.get("/demo/items_tags")
-async def demo_items_tags(
-    limit: int = 50,
-    session: AsyncSession = Depends(get_async_session),
-):
-    SAItem = get_mapped_class(Item)
-    SATag = get_mapped_class(Tag)
-    SAItemTag = get_mapped_class(ItemTag)
+@_register_keyset_statement("items.tags")
+def _items_tags_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    SATag = m.mapped(Tag)
+    SAItemTag = m.mapped(ItemTag)
 
     j = (SAItem.__table__
          .join(SAItemTag.__table__, SAItem.id == SAItemTag.item_id)
          .join(SATag.__table__, SATag.id == SAItemTag.tag_id))
 
-    stmt = select(
-        SAItem.id.label("item_id"),
-        SAItem.name.label("item_name"),
-        SATag.id.label("tag_id"),
-        SATag.title.label("tag"),
-        SAItemTag.weight,
-    ).select_from(j).limit(limit)
+    return _keyset(
+        select(
+            SAItem.id.label("item_id"),
+            SAItem.name.label("item_name"),
+            SAItem.created_at,
+            SATag.id.label("tag_id"),
+            SATag.title.label("tag"),
+            SAItemTag.weight,
+        ).select_from(j),
+        after, SAItem.created_at, SAItem.id, SATag.id,
+    )
+
+
+@router.get("/demo/items_tags", dependencies=[conditional_get(Item, Tag, ItemTag)])
+@cached(Item, Tag, ItemTag)
+async def demo_items_tags(
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    rows = await _fetch_page(session, "items.tags", page, _BY_CREATED_CHILD)
+    return _page_response(page, "items.tags", rows, "created_at", "item_id", "tag_id")
+
+
+# 5) Item целиком: supplier + categories + tags(weight) одним запросом, одна строка на item.
+# M2M собираются коррелированными jsonb_agg-подзапросами — строки не размножаются.
+_EMPTY_JSONB = literal_column("'[]'::jsonb", JSONB)
+
+
+def item_categories_agg(m, SAItem):
+    """ [{"id", "title"}, ...] категорий item'а (коррелированный подзапрос) """
+    SACategory = m.mapped(Category)
+    secondary = m.metadata.tables[Item._meta.get_field("categories").m2m_db_table()]
+    obj = func.jsonb_build_object("id", SACategory.id, "title", SACategory.title)
+    return (
+        select(func.coalesce(func.jsonb_agg(aggregate_order_by(obj, SACategory.id)), _EMPTY_JSONB,
+                             type_=JSONB))
+        .select_from(SACategory.__table__.join(secondary, SACategory.id == secondary.c.category_id))
+        .where(secondary.c.item_id == SAItem.id)
+        .scalar_subquery()
+    )
+
+
+def item_tags_agg(m, SAItem):
+    """ [{"id", "title", "weight"}, ...] тегов item'а через ItemTag """
+    SATag = m.mapped(Tag)
+    SAItemTag = m.mapped(ItemTag)
+    obj = func.jsonb_build_object("id", SATag.id, "title", SATag.title, "weight", SAItemTag.weight)
+    return (
+        select(func.coalesce(func.jsonb_agg(aggregate_order_by(obj, SATag.id)), _EMPTY_JSONB,
+                             type_=JSONB))
+        .select_from(SATag.__table__.join(SAItemTag.__table__, SATag.id == SAItemTag.tag_id))
+        .where(SAItemTag.item_id == SAItem.id)
+        .scalar_subquery()
+    )
+
 
-    rows = (await session.execute(stmt)).mappings().all()
-    return [dict(r) for r in rows]
+@_register_keyset_statement("items.nested")
+def _items_nested_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    SASupplier = m.mapped(Supplier)
+
+    supplier = func.jsonb_build_object("id", SASupplier.id, "name", SASupplier.name, type_=JSONB)
+    j = SAItem.__table__.outerjoin(SASupplier.__table__, SAItem.supplier_id == SASupplier.id)
+    return _keyset(
+        select(
+            SAItem.id,
+            SAItem.name,
+            SAItem.created_at,
+            case((SASupplier.id.is_(None), null()), else_=supplier).label("supplier"),
+            item_categories_agg(m, SAItem).label("categories"),
+            item_tags_agg(m, SAItem).label("tags"),
+        ).select_from(j),
+        after, SAItem.created_at, SAItem.id,
+    )
+
+
+@router.get(
+    "/demo/items_nested",
+    dependencies=[conditional_get(Item, Supplier, Category, Item.categories.through, Tag, ItemTag)],
+)
+@cached(Item, Supplier, Category, Item.categories.through, Tag, ItemTag)
+async def demo_items_nested(
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    rows = await _fetch_page(session, "items.nested", page, _BY_CREATED)
+    return _page_response(page, "items.nested", rows, "created_at", "id")
+
+
+# 6) Справочники: маленькие и горячие — кроме Redis кэшируются в LRU воркера
+@register_statement("categories.list")
+def _categories_list_stmt(m):
+    SACategory = m.mapped(Category)
+    return select(SACategory.id, SACategory.title).order_by(SACategory.id)
+
+
+@register_statement("tags.list")
+def _tags_list_stmt(m):
+    SATag = m.mapped(Tag)
+    return select(SATag.id, SATag.title).order_by(SATag.id)
+
+
+async def _fetch_all(session: AsyncSession, name: str) -> list:
+    stmt = get_statement(name)
+    if settings.raw_fast_path:
+        return await fetch_records(session, stmt)
+    return [dict(r) for r in (await session.execute(stmt)).mappings()]
+
+
+@router.get("/demo/categories")
+@cached(Category, local=True)
+async def demo_categories(session: AsyncSession = Depends(get_async_read_session)):
+    return json_response(await _fetch_all(session, "categories.list"))
+
+
+@router.get("/demo/tags")
+@cached(Tag, local=True)
+async def demo_tags(session: AsyncSession = Depends(get_async_read_session)):
+    return json_response(await _fetch_all(session, "tags.list"))
+
+
+# 7) Поиск: full-text по search_vector (префиксы) ИЛИ pg_trgm word similarity (опечатки),
+# оба условия по GIN-индексам; ранг = ts_rank + word_similarity, как в ItemAdmin (apps/core/search.py)
+@_register_keyset_statement("items.search")
+def _items_search_stmt(m, after: bool):
+    SAItem = m.mapped(Item)
+    q = bindparam("q", type_=String)
+    tsquery = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), bindparam("tsquery", type_=String))
+    # float8: ранг уходит в курсор и должен точно совпасть при сравнении на следующей странице
+    rank = cast(func.ts_rank(SAItem.search_vector, tsquery) + func.word_similarity(q, SAItem.name), Float)
+    matched = (
+        select(SAItem.id, SAItem.name, SAItem.created_at, rank.label("rank"))
+        .where(or_(SAItem.search_vector.op("@@")(tsquery), q.op("<%")(SAItem.name)))
+        .subquery()
+    )
+    return _keyset(select(matched), after, matched.c.rank, matched.c.id)
+
+
+@router.get("/demo/items/search", dependencies=[conditional_get(Item)])
+@cached(Item)
+async def demo_items_search(
+    q: str = Query(..., min_length=2, max_length=200),
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    tsquery = prefix_tsquery(q)
+    if not tsquery:
+        return json_response([])
+    rows = await _fetch_page(session, "items.search", page, _BY_RANK, q=q, tsquery=tsquery)
+    return _page_response(page, "items.search", rows, "rank", "id")
+
+
+# 8) Фасеты: страница items + счётчики по supplier / category / tag одним запросом.
+# Фильтры: И между измерениями, ИЛИ внутри (supplier=1&supplier=2 — любой из двух).
+# Счётчик измерения считается с фильтрами остальных измерений, но не своего
+# (выбранная категория не обнуляет соседние).
+FACETS = ("supplier", "category", "tag")
 
 
-# 5) Агрегация: число позиций в заказе по пользователю
-@router.get("/demo/orders_stats/{user_id}")
-async def demo_orders_stats(
-    user_id: int,
-    session: AsyncSession = Depends(get_async_session),
+def _facet_dimension(m, dim: str):
+    """ (таблица, колонка item_id, колонка значения) измерения: core_item или таблица связи """
+    if dim == "supplier":
+        table = m.mapped(Item).__table__
+        return table, table.c.id, table.c.supplier_id
+    if dim == "category":
+        table = m.metadata.tables[Item._meta.get_field("categories").m2m_db_table()]
+        return table, table.c.item_id, table.c.category_id
+    table = m.mapped(ItemTag).__table__
+    return table, table.c.item_id, table.c.tag_id
+
+
+def _facet_match(m, dim: str):
+    return _facet_dimension(m, dim)[2] == any_(bindparam(f"{dim}_ids", type_=ARRAY(BigInteger)))
+
+
+def _facet_conds(m, filters: tuple, source, item_id) -> list:
+    """
+    Условия фильтров на строки source: своя колонка напрямую, чужие измерения —
+    полусоединение item_id IN (...) по покрывающим индексам (category_id, item_id) / (tag_id, item_id).
+    """
+    conds = []
+    for dim, _ in filters:
+        table, dim_item_id, _ = _facet_dimension(m, dim)
+        if table is source:
+            conds.append(_facet_match(m, dim))
+        else:
+            conds.append(item_id.in_(select(dim_item_id).where(_facet_match(m, dim))))
+    return conds
+
+
+def _facet_counts(m, filters: tuple, dim: str):
+    """ Топ значений измерения по числу подходящих items (LIMIT :facet_limit) """
+    SAValue = {"supplier": Supplier, "category": Category, "tag": Tag}[dim]
+    SAValue = m.mapped(SAValue)
+    title = SAValue.name if dim == "supplier" else SAValue.title
+    source, item_id, value_id = _facet_dimension(m, dim)
+    others = tuple((d, many) for d, many in filters if d != dim)
+    # Ведущий фильтр — supplier или измерение с одним значением: у такого item_id не повторяются,
+    # и вместо полусоединения с полной таблицей source идёт nested loop по покрывающему индексу
+    # ведущего измерения в уникальный индекс (item_id, ...) source — index-only с обеих сторон.
+    # При нескольких значениях (ИЛИ) join размножил бы строки — остаётся полусоединение.
+    driver = next((d for d, many in others if d == "supplier" or not many), None)
+    if driver is not None:
+        table, driver_item_id, _ = _facet_dimension(m, driver)
+        rest = tuple(f for f in others if f[0] != driver)
+        conds = [_facet_match(m, driver), *_facet_conds(m, rest, source, item_id)]
+        source = source.join(table, driver_item_id == item_id)
+    else:
+        conds = _facet_conds(m, others, source, item_id)
+    count = func.count().label("count")
+    # сначала агрегат по id (миллионы строк связей), названия — только к топу
+    top = (
+        select(value_id.label("id"), count)
+        .select_from(source)
+        .where(value_id.is_not(None), *conds)
+        .group_by(value_id)
+        .order_by(count.desc(), value_id)
+        .limit(bindparam("facet_limit", type_=Integer))
+        .subquery(f"{dim}_top")
+    )
+    return (
+        select(literal_column(f"'{dim}'", String).label("kind"), top.c.id, cast(title, String).label("title"),
+               null().cast(m.mapped(Item).created_at.type).label("created_at"), top.c.count)
+        .select_from(top.join(SAValue.__table__, SAValue.id == top.c.id))
+    )
+
+
+def _facets_statement_name(filters: tuple) -> str:
+    """ filters: ((dim, несколько значений?), ...) -> "items.facets:supplier+tag*" """
+    return "items.facets:" + ("+".join(dim + ("*" if many else "") for dim, many in filters) or "-")
+
+
+def _register_facets_statements():
+    """ Вариант statement'а на каждый набор фильтров (нет / одно значение / несколько) """
+    for states in product((None, False, True), repeat=len(FACETS)):
+        filters = tuple((dim, many) for dim, many in zip(FACETS, states) if many is not None)
+        _register_keyset_statement(_facets_statement_name(filters))(
+            lambda m, after, filters=filters: _items_facets_stmt(m, after, filters)
+        )
+
+
+def _items_facets_stmt(m, after: bool, filters: tuple):
+    SAItem = m.mapped(Item)
+    page = _keyset(
+        select(literal_column("'item'", String).label("kind"), SAItem.id,
+               cast(SAItem.name, String).label("title"), SAItem.created_at,
+               null().cast(BigInteger).label("count"))
+        .where(*_facet_conds(m, filters, SAItem.__table__, SAItem.id)),
+        after, SAItem.created_at, SAItem.id,
+    ).subquery("page")
+    # один round trip: UNION ALL страницы и трёх агрегатов, разбор по kind в _split_facets
+    return union_all(
+        select(page),
+        *(select(_facet_counts(m, filters, dim).subquery(dim)) for dim in FACETS),
+    )
+
+
+_register_facets_statements()
+
+
+def _split_facets(rows: list) -> tuple[list, dict]:
+    """ Строки UNION ALL -> (страница items, {"supplier": [...], "category": [...], "tag": [...]}) """
+    items, facets = [], {dim: [] for dim in FACETS}
+    for row in rows:
+        if row["kind"] == "item":
+            items.append({"id": row["id"], "name": row["title"], "created_at": row["created_at"]})
+        else:
+            facets[row["kind"]].append({"id": row["id"], "title": row["title"], "count": row["count"]})
+    # UNION ALL не гарантирует порядок веток — восстанавливаем порядок ORDER BY каждой из них
+    items.sort(key=lambda r: (r["created_at"], r["id"]), reverse=True)
+    for values in facets.values():
+        values.sort(key=lambda r: (-r["count"], r["id"]))
+    return items, facets
+
+
+@router.get(
+    "/demo/items/facets",
+    dependencies=[conditional_get(Item, Supplier, Category, Item.categories.through, Tag, ItemTag)],
+)
+@cached(Item, Supplier, Category, Item.categories.through, Tag, ItemTag)
+async def demo_items_facets(
+    supplier: list[int] = Query([]),
+    category: list[int] = Query([]),
+    tag: list[int] = Query([]),
+    facet_limit: int = Query(50, ge=1, le=settings.facets_max_values),
+    page: CursorPage = Depends(cursor_pagination_params),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
-    SAOrder = get_mapped_class(Order)
-    SAOrderItem = get_mapped_class(OrderItem)
-    # count(order_items) по всем заказам пользователя
-    j = join(SAOrder, SAOrderItem, SAOrder.id == SAOrderItem.order_id)
-    total = (await session.execute(
-        select(func.count()).select_from(j).where(SAOrder.user_id == user_id)
-    )).scalar_one()
-    return {"user_id": user_id, "order_items_count": total}
+    selected = {dim: sorted(set(ids)) for dim, ids in zip(FACETS, (supplier, category, tag)) if ids}
+    filters = tuple((dim, len(ids) > 1) for dim, ids in selected.items())
+    name = _facets_statement_name(filters)
+    rows = await _fetch_page(
+        session, name, page, _BY_CREATED,
+        facet_limit=facet_limit, **{f"{dim}_ids": ids for dim, ids in selected.items()},
+    )
+    items, facets = _split_facets(rows)
+    cursor = page.next_cursor(items, _cursor_scope(name), "created_at", "id")
+    return json_response(
+        {"items": items, "facets": facets},
+        headers={NEXT_CURSOR_HEADER: cursor} if cursor else None,
+    )
@@ -0,0 +1,119 @@
+# src/fastapi_app/routes/orders.py
+"""
+Заказы: пакетное создание и агрегаты пользователя.
+POST /demo/orders — заказы пакета, их строки и инкремент core_user_order_stats
+одним statement'ом (один round trip, одна транзакция).
+GET /demo/orders_stats/{user_id} — готовые агрегаты по primary key, без count(*) по истории.
+Изменения заказов через Django пересчитывают агрегаты сами (apps/core/signals.py).
+"""
+import logging
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Path
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.core.models import Order, OrderItem, UserOrderStats
+
+from ..asyncdb.auto import get_statement, register_statement
+from ..asyncdb.engine import get_async_session
+from ..asyncdb.replicas import get_async_read_session
+from ..core.cache import bump_tags, cache_tag, cached
+from ..core.responses import json_response
+from ..schemas.orders import INT4_MAX, OrderIn, OrderOut
+from ..settings.config import settings
+
+logger = logging.getLogger("logger")
+
+router = APIRouter()
+
+# Заказы пакета приходят развёрнутыми в строки: (порядковый номер заказа, user_id, item_id, qty)
+_CREATE_ORDERS_SQL = text("""
+    WITH lines AS (
+        -- повторы item в одном заказе отсекает схема (OrderIn): unique (order_id, item_id)
+        SELECT l.ord, l.user_id, l.item_id, l.qty
+        FROM unnest(
+            CAST(:ords AS integer[]), CAST(:user_ids AS integer[]),
+            CAST(:item_ids AS bigint[]), CAST(:qtys AS integer[])
+        ) AS l(ord, user_id, item_id, qty)
+    ), orders AS (
+        -- id заранее из identity-последовательности: по нему строки связываются с заказом
+        SELECT o.ord, o.user_id, nextval(pg_get_serial_sequence('core_order', 'id')) AS id
+        FROM (SELECT DISTINCT ord, user_id FROM lines ORDER BY ord) o
+    ), new_orders AS (
+        INSERT INTO core_order (id, user_id, created_at)
+        SELECT id, user_id, now() FROM orders ORDER BY ord
+        RETURNING id, user_id, created_at
+    ), new_items AS (
+        INSERT INTO core_order_item (order_id, item_id, qty)
+        SELECT o.id, l.item_id, l.qty FROM lines l JOIN orders o USING (ord)
+    ), stats AS (
+        -- строки агрегатов блокируются в порядке user_id — пакеты не дедлочат друг друга
+        INSERT INTO core_user_order_stats AS s (user_id, orders_count, items_count, qty_total, updated_at)
+        SELECT user_id, count(DISTINCT ord), count(*), sum(qty), now()
+        FROM lines GROUP BY user_id ORDER BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            orders_count = s.orders_count + EXCLUDED.orders_count,
+            items_count = s.items_count + EXCLUDED.items_count,
+            qty_total = s.qty_total + EXCLUDED.qty_total,
+            updated_at = EXCLUDED.updated_at
+    )
+    SELECT n.id, n.user_id, n.created_at FROM new_orders n JOIN orders o USING (id) ORDER BY o.ord
+""")
+
+_ORDER_TAGS = {cache_tag(Order), cache_tag(OrderItem), cache_tag(UserOrderStats)}
+
+
+def _order_lines(orders: list[OrderIn]) -> dict:
+    params = {"ords": [], "user_ids": [], "item_ids": [], "qtys": []}
+    for ord_, order in enumerate(orders):
+        for line in order.items:
+            params["ords"].append(ord_)
+            params["user_ids"].append(order.user_id)
+            params["item_ids"].append(line.item_id)
+            params["qtys"].append(line.qty)
+    return params
+
+
+@router.post("/demo/orders", response_model=list[OrderOut], status_code=201)
+async def demo_orders_create(
+    orders: list[OrderIn] = Body(min_length=1, max_length=settings.orders_batch_max),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """ Пакет заказов (в порядке запроса) — одним statement'ом вместе с агрегатами пользователей """
+    try:
+        rows = (await session.execute(_CREATE_ORDERS_SQL, _order_lines(orders))).mappings().all()
+        # FK в Django-схеме DEFERRABLE: неизвестный user_id/item_id всплывает на commit
+        await session.commit()
+    except IntegrityError as e:
+        await session.rollback()
+        logger.info("Order batch rejected: %s", e.orig)
+        raise HTTPException(status_code=422, detail="Unknown user_id or item_id")
+
+    await bump_tags(_ORDER_TAGS)
+    return json_response([dict(r) for r in rows], status_code=201)
+
+
+# Раньше: count(*) по core_order JOIN core_order_item на каждый вызов — росло с историей заказов
+@register_statement("orders.stats")
+def _orders_stats_stmt(m):
+    SAStats = m.mapped(UserOrderStats)
+    return select(SAStats.orders_count, SAStats.items_count, SAStats.qty_total).where(
+        SAStats.user_id == bindparam("user_id")
+    )
+
+
+@router.get("/demo/orders_stats/{user_id}")
+@cached(UserOrderStats)
+async def demo_orders_stats(
+    user_id: int = Path(ge=1, le=INT4_MAX),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    row = (await session.execute(get_statement("orders.stats"), {"user_id": user_id})).first()
+    orders_count, items_count, qty_total = row or (0, 0, 0)
+    return json_response({
+        "user_id": user_id,
+        "order_items_count": items_count,
+        "orders_count": orders_count,
+        "qty_total": qty_total,
+    })
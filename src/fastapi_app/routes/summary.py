@@ -0,0 +1,140 @@
+# src/fastapi_app/routes/summary.py
+"""
+Каталожные агрегаты из materialized view core_item_summary (apps/core/summary.py):
+готовые строки по индексу вместо GROUP BY по миллионам строк связей на каждый запрос.
+Данные отстают от таблиц на интервал beat (ITEM_SUMMARY_REFRESH_INTERVAL); refreshed_at — в ответе
+и в Last-Modified.
+После обновления view Celery увеличивает тег кэша core_item_summary — @cached сбрасывается сам.
+"""
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import (BigInteger, DateTime, Integer, String, bindparam,
+                        column, select, table, text)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.core.summary import SUMMARY_VIEW
+
+from ..asyncdb.auto import get_statement, register_statement
+from ..asyncdb.engine import fetch_records
+from ..asyncdb.replicas import get_async_read_session
+from ..core.cache import cached
+from ..core.middlewares import conditional_get
+from ..core.responses import json_response
+from ..settings.config import settings
+
+router = APIRouter()
+
+# view не входит в маппинг (automap/static отражают только таблицы моделей) — описываем колонки сами
+_summary = table(
+    SUMMARY_VIEW,
+    column("kind", String),
+    column("value_id", BigInteger),
+    column("title", String),
+    column("items_count", BigInteger),
+    column("weight_total", BigInteger),
+    column("refreshed_at", DateTime(timezone=True)),
+)
+
+SummaryKind = Literal["supplier", "category", "tag"]
+
+# View без данных (REFRESH ... WITH NO DATA, восстановление из дампа без данных) читать нельзя:
+# пока beat его не заполнит, роуты считают те же агрегаты по таблицам (дорого, но верно), refreshed_at = null
+_POPULATED_SQL = text("SELECT relispopulated FROM pg_class WHERE oid = CAST(:view AS regclass)")
+_LIVE_CATALOG_SQL = text("SELECT count(*) AS items_count, NULL::timestamptz AS refreshed_at FROM core_item")
+_LIVE_VALUES_SQL = {
+    "supplier": text("""
+        SELECT s.id, s.name AS title, coalesce(a.items_count, 0) AS items_count, NULL::bigint AS weight_total
+        FROM core_supplier s
+        LEFT JOIN (SELECT supplier_id, count(*) AS items_count FROM core_item GROUP BY supplier_id) a
+            ON a.supplier_id = s.id
+        ORDER BY items_count DESC, s.id LIMIT :limit
+    """),
+    "category": text("""
+        SELECT c.id, c.title, coalesce(a.items_count, 0) AS items_count, NULL::bigint AS weight_total
+        FROM core_category c
+        LEFT JOIN (SELECT category_id, count(*) AS items_count FROM core_item_categories GROUP BY category_id) a
+            ON a.category_id = c.id
+        ORDER BY items_count DESC, c.id LIMIT :limit
+    """),
+    "tag": text("""
+        SELECT t.id, t.title, coalesce(a.items_count, 0) AS items_count, coalesce(a.weight_total, 0) AS weight_total
+        FROM core_tag t
+        LEFT JOIN (SELECT tag_id, count(*) AS items_count, sum(weight) AS weight_total
+                   FROM core_item_tag GROUP BY tag_id) a
+            ON a.tag_id = t.id
+        ORDER BY items_count DESC, t.id LIMIT :limit
+    """),
+}
+
+
+@register_statement("summary.catalog")
+def _summary_catalog_stmt(m):
+    return select(_summary.c.items_count, _summary.c.refreshed_at).where(_summary.c.kind == "catalog")
+
+
+@register_statement("summary.values")
+def _summary_values_stmt(m):
+    # по unique-индексу (kind, value_id); значений измерения — сотни, сортировка в памяти
+    return (
+        select(_summary.c.value_id.label("id"), _summary.c.title, _summary.c.items_count,
+               _summary.c.weight_total)
+        .where(_summary.c.kind == bindparam("kind", type_=String))
+        .order_by(_summary.c.items_count.desc(), _summary.c.value_id)
+        .limit(bindparam("limit", type_=Integer))
+    )
+
+
+@register_statement("summary.refreshed_at")
+def _summary_refreshed_at_stmt(m):
+    return select(_summary.c.refreshed_at).where(_summary.c.kind == "catalog")
+
+
+async def _populated(session: AsyncSession) -> bool:
+    return bool((await session.execute(_POPULATED_SQL, {"view": SUMMARY_VIEW})).scalar())
+
+
+async def _refreshed_at(session: AsyncSession) -> Optional[datetime]:
+    """ Last-Modified роутов summary: данные view меняются только при REFRESH, он же пишет refreshed_at """
+    if not await _populated(session):
+        return None
+    return (await session.execute(get_statement("summary.refreshed_at"))).scalar()
+
+
+_conditional_get = conditional_get(SUMMARY_VIEW, last_modified=_refreshed_at)
+
+
+async def _fetch(session: AsyncSession, name: str, params: dict) -> list:
+    stmt = get_statement(name)
+    if settings.raw_fast_path:
+        return await fetch_records(session, stmt, params)
+    return [dict(r) for r in (await session.execute(stmt, params)).mappings()]
+
+
+@router.get("/demo/summary", dependencies=[_conditional_get])
+@cached(SUMMARY_VIEW)
+async def demo_summary(session: AsyncSession = Depends(get_async_read_session)):
+    if await _populated(session):
+        rows = await _fetch(session, "summary.catalog", {})
+        if rows:
+            return json_response(rows[0])
+    return json_response(dict((await session.execute(_LIVE_CATALOG_SQL)).mappings().one()))
+
+
+@router.get("/demo/summary/{kind}", dependencies=[_conditional_get])
+@cached(SUMMARY_VIEW)
+async def demo_summary_values(
+    kind: SummaryKind,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_async_read_session),
+):
+    """ items по значениям измерения (лучшие первыми); weight_total — сумма весов, только для tag """
+    params = {"kind": kind, "limit": limit}
+    if await _populated(session):
+        rows = await _fetch(session, "summary.values", params)
+    else:
+        rows = [dict(r) for r in (await session.execute(_LIVE_VALUES_SQL[kind], params)).mappings()]
+    if kind != "tag":
+        rows = [{k: v for k, v in r.items() if k != "weight_total"} for r in rows]
+    return json_response(rows)
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class IngestResult(BaseModel):
+    rows: int
+    suppliers_created: int
+    categories_created: int
+    tags_created: int
+    items_created: int
+    items_updated: int
+    categories_linked: int
+    categories_unlinked: int
+    tags_linked: int
+    tags_unlinked: int
+    tags_reweighted: int
+    seconds: float
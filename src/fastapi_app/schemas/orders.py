@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field, field_validator
+
+# Границы — по типам колонок (auth_user.id и qty — integer, core_item.id — bigint):
+# значение вне диапазона — 422, а не ошибка asyncpg (500)
+INT4_MAX = 2**31 - 1
+INT8_MAX = 2**63 - 1
+
+
+class OrderLineIn(BaseModel):
+    item_id: Annotated[int, Field(ge=1, le=INT8_MAX)]
+    qty: int = Field(default=1, ge=1, le=INT4_MAX)
+
+
+class OrderIn(BaseModel):
+    user_id: Annotated[int, Field(ge=1, le=INT4_MAX)]
+    items: list[OrderLineIn] = Field(min_length=1)
+
+    @field_validator("items")
+    @classmethod
+    def unique_items(cls, items: list[OrderLineIn]) -> list[OrderLineIn]:
+        """ Один item — одна строка заказа (unique (order_id, item_id)); сумма qty могла бы выйти за integer """
+        if len({line.item_id for line in items}) != len(items):
+            raise ValueError("duplicate item_id in order items")
+        return items
+
+
+class OrderOut(BaseModel):
+    id: int
+    user_id: int
+    created_at: datetime
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal
 
 from pydantic import AnyHttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,9 +17,92 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     uvicorn_access_log: bool = True
 
+    # Сериализация ответов: orjson — быстрый encoder по умолчанию, default — jsonable_encoder FastAPI
+    json_encoder: Literal["orjson", "default"] = "orjson"
+
+    # Кэш ответов read-роутов в Redis (пусто — кэш выключен)
+    redis_url: str = ""
+    cache_ttl: float = 60.0  # сек
+    # Доля TTL в конце жизни записи, когда один запрос пересчитывает её заранее
+    cache_early_recompute: float = 0.1
+    # Сколько держится lock пересчёта и сколько остальные ждут результат, сек
+    cache_lock_timeout: float = 5.0
+    cache_wait_interval: float = 0.025
+    cache_redis_timeout: float = 1.0
+    # Канал Redis, в который Django публикует новые версии тегов
+    cache_tags_channel: str = "cache:tags"
+    # Сколько воркер доверяет известной версии тега без pub/sub-обновлений, сек
+    cache_version_ttl: float = 1.0
+    # LRU в памяти воркера для @cached(..., local=True)
+    cache_local_maxsize: int = 1024
+    cache_local_ttl: float = 30.0
+
+    # Потоковый экспорт: сколько строк читать из серверного курсора и отдавать одним чанком
+    export_chunk_rows: int = 1000
+
+    # POST /demo/orders: максимум заказов в одном пакете (один statement)
+    orders_batch_max: int = 1000
+
+    # GET /demo/items/facets: верхняя граница facet_limit (значений на измерение)
+    facets_max_values: int = 200
+
+    # Fast path для read-only списков: SQL напрямую через asyncpg, строки — asyncpg.Record
+    raw_fast_path: bool = False
+
+    # Подпись курсоров пагинации (пусто — берём SECRET_KEY; нет и его — приложение не стартует)
+    cursor_secret: str = ""
+
+    # Пул соединений primary (на каждый воркер uvicorn!):
+    # воркеры × (pool_size + max_overflow) × (1 + реплики) должно влезать в max_connections Postgres
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # сек, -1 — не пересоздавать
+    db_pool_timeout: float = 30.0  # сек ожидания свободного соединения
+    # Размер кэша prepared statements на соединение (0 — выключить, нужно за PgBouncer)
+    db_statement_cache_size: int = 100
+    # pre-ping на каждом checkout (лишний round trip); по умолчанию — проверка по времени простоя
+    db_pre_ping: bool = False
+    db_liveness_interval: float = 30.0  # сек простоя, после которых соединение пингуется
+    # За PgBouncer в transaction pooling: без кэша prepared statements, уникальные имена.
+    # Без PgBouncer оставляйте False — кэш statement'ов сохраняется
+    db_pgbouncer: bool = False
+
+    # Реплики для read-only роутов (JSON-список URL postgresql+asyncpg://...); пусто — всё на primary
+    replica_database_urls: List[str] = []
+    # Выбор реплики: round_robin или least_loaded (меньше занятых соединений в пуле)
+    replica_strategy: Literal["round_robin", "least_loaded"] = "round_robin"
+    # Реплика с лагом больше этого (сек) не используется — читаем с primary
+    replica_max_lag: float = 5.0
+    replica_lag_check_interval: float = 2.0
+    # Таймаут замера одной реплики (сек); замер старше replica_lag_max_age — лаг неизвестен
+    replica_lag_check_timeout: float = 1.0
+    replica_lag_max_age: float = 10.0
+    # Пул каждого replica-engine (остальные параметры пула — db_*)
+    replica_pool_size: int = 5
+    replica_max_overflow: int = 10
+
     # Интеграция с Django
     django_settings_module: str = "django_project.settings"
 
+    # Маппинг: reflect — отражение схемы из БД, static — из Django _meta без запросов к БД
+    mapping_mode: Literal["reflect", "static"] = "reflect"
+
+    # Сигнатура миграций: fast — count+max(id), full — sha256 всех строк django_migrations
+    mapping_signature: Literal["fast", "full"] = "fast"
+    # Период фоновой проверки свежести маппинга в каждом воркере, сек (0 — выключено)
+    mapping_check_interval: float = 5.0
+
+    # LISTEN/NOTIFY: Django после migrate шлёт pg_notify в этот канал, каждый воркер слушает
+    mapping_listen: bool = True
+    mapping_notify_channel: str = "fastapi_refresh_mapping"
+    # Прямой адрес Postgres для LISTEN (в обход PgBouncer: в transaction mode LISTEN не работает);
+    # пусто — адрес основного engine
+    mapping_listen_url: str = ""
+
+    # Снапшот automap (отражённая схема) — общий для воркеров; пусто — не использовать.
+    # Только в директории приложения, недоступной на запись другим (не /tmp): файл — pickle
+    mapping_snapshot_path: str = ""
+
     model_config = SettingsConfigDict(env_prefix="FASTAPI_", env_file=None, extra="ignore")
 
 
@@ -0,0 +1,40 @@
+# src/fastapi_app/tests/conftest.py
+"""
+Интеграционные тесты FastAPI-слоя: нужен Postgres с применёнными миграциями
+(те же POSTGRES_* ENV, что у приложения). Без базы тесты пропускаются.
+
+    cd src && python -m pytest fastapi_app/tests
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from ..core.django_init import ensure_django_initialized
+from ..settings.config import settings
+
+ensure_django_initialized(settings.django_settings_module)
+
+
+def sync_database_url() -> str:
+    """ Тот же адрес, что у asyncpg-engine (asyncdb/engine.py), но для psycopg2 """
+    user = os.getenv("POSTGRES_USER", "app_user")
+    password = os.getenv("POSTGRES_PASSWORD", "app_password")
+    host = os.getenv("POSTGRES_HOST", "postgres")
+    port = os.getenv("POSTGRES_PORT", "5432")
+    db = os.getenv("POSTGRES_DB", "app_db")
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
+
+
+@pytest.fixture(scope="session")
+def sync_conn():
+    engine = create_engine(sync_database_url(), connect_args={"connect_timeout": 3})
+    try:
+        conn = engine.connect()
+    except Exception as e:
+        pytest.skip(f"Postgres is not available: {e}")
+    try:
+        yield conn
+    finally:
+        conn.close()
+        engine.dispose()
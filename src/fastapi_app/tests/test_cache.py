@@ -0,0 +1,144 @@
+# src/fastapi_app/tests/test_cache.py
+"""
+Кэш ответов (core/cache.py) на fakeredis: база не нужна.
+Один FakeServer на тест — его видят и async-клиент FastAPI, и sync-клиент Django (apps/core/signals.py).
+"""
+import asyncio
+
+import fakeredis
+import pytest
+from starlette.requests import Request
+
+from apps.core import signals
+
+from ..core import cache
+from ..core.responses import json_response
+from ..settings.config import settings
+
+TAG = "core_item"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(settings, "redis_url", "redis://fake")
+    monkeypatch.setattr(cache, "_redis", fakeredis.aioredis.FakeRedis(server=server))
+    # listen_cache_tags открывает собственное соединение
+    monkeypatch.setattr(cache.Redis, "from_url", lambda *args, **kwargs: fakeredis.aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(signals, "_redis_client", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(signals, "FASTAPI_CACHE_TAGS_CHANNEL", settings.cache_tags_channel)
+    cache._versions.clear()
+    cache.local_cache.clear()
+    yield server
+    cache._versions.clear()
+    cache.local_cache.clear()
+
+
+def _request(path: str = "/api/demo/items") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"limit=5", "headers": []})
+
+
+class Counter:
+    """ compute() роута: считает вызовы, может работать «долго» """
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return json_response({"calls": self.calls})
+
+
+async def _get(compute, local: bool = False) -> str:
+    response = await cache.cache_response(_request(), (TAG,), 60.0, compute, local=local)
+    return response.headers[cache.CACHE_HEADER]
+
+
+async def _wait_version(version: int) -> None:
+    for _ in range(100):
+        if cache._versions.get(TAG, (0,))[0] >= version:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"tag version {version} was not received")
+
+
+async def _with_listener(scenario) -> None:
+    listener = asyncio.create_task(cache.listen_cache_tags(settings.cache_tags_channel))
+    try:
+        await asyncio.sleep(0.05)  # подписка
+        await scenario()
+    finally:
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+def test_miss_then_hit(server):
+    compute = Counter()
+
+    async def scenario():
+        assert await _get(compute) == "MISS"
+        assert await _get(compute) == "HIT"
+
+    asyncio.run(scenario())
+    assert compute.calls == 1
+
+
+def test_bump_tags_invalidates(server):
+    compute = Counter()
+
+    async def scenario():
+        assert await _get(compute) == "MISS"
+        await cache.bump_tags({TAG})
+        assert await _get(compute) == "MISS"
+        assert await _get(compute) == "HIT"
+
+    asyncio.run(scenario())
+    assert compute.calls == 2
+    assert fakeredis.FakeRedis(server=server).get(cache.TAG_VERSION_PREFIX + TAG) == b"1"
+
+
+def test_django_bump_publishes_new_version(server):
+    """ INCR + PUBLISH из Django: подписчик поднимает версию, не дожидаясь cache_version_ttl """
+    compute = Counter()
+
+    async def scenario():
+        assert await _get(compute) == "MISS"
+        signals.bump_cache_tags({TAG})
+        await _wait_version(1)
+        assert await _get(compute) == "MISS"
+
+    asyncio.run(_with_listener(scenario))
+    assert compute.calls == 2
+
+
+def test_local_cache_follows_published_version(server, monkeypatch):
+    """ local=True: запись воркера привязана к версии тега, после PUBLISH она больше не отдаётся """
+    monkeypatch.setattr(settings, "cache_version_ttl", 3600.0)
+    compute = Counter()
+
+    async def scenario():
+        assert await _get(compute, local=True) == "MISS"
+        assert await _get(compute, local=True) == "LOCAL"
+        signals.bump_cache_tags({TAG})
+        await _wait_version(1)
+        assert await _get(compute, local=True) == "MISS"
+        assert await _get(compute, local=True) == "LOCAL"
+
+    asyncio.run(_with_listener(scenario))
+    assert compute.calls == 2
+
+
+def test_concurrent_misses_compute_once(server):
+    """ Stampede: lock SET NX берёт один запрос, остальные дожидаются его записи """
+    compute = Counter(delay=0.1)
+
+    async def scenario():
+        return await asyncio.gather(*(_get(compute) for _ in range(20)))
+
+    statuses = asyncio.run(scenario())
+    assert compute.calls == 1
+    assert sorted(statuses) == ["HIT"] * 19 + ["MISS"]
+    assert fakeredis.FakeRedis(server=server).keys(cache.LOCK_PREFIX + "*") == []
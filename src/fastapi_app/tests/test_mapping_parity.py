@@ -0,0 +1,37 @@
+# src/fastapi_app/tests/test_mapping_parity.py
+"""
+Static-маппинг (FASTAPI_MAPPING_MODE=static, из Django _meta) должен совпадать с reflection
+базы после migrate: колонки, семейства типов, nullable/PK, FK и unique-наборы.
+Падение теста — static.py не знает о новом поле/типе модели.
+"""
+from sqlalchemy import MetaData
+
+from ..asyncdb import static
+from ..asyncdb.static import build_static_metadata, compare_with_reflection
+
+
+def test_static_mapping_matches_reflection(sync_conn):
+    assert compare_with_reflection(sync_conn) == []
+
+
+def test_static_mapping_covers_all_model_tables(sync_conn):
+    reflected = MetaData()
+    reflected.reflect(bind=sync_conn)
+    assert set(build_static_metadata().tables) <= set(reflected.tables)
+
+
+def test_parity_check_reports_drift(sync_conn, monkeypatch):
+    """ Сама проверка не слепая: подменённый тип колонки и потерянный FK видны в diffs """
+    def drifted() -> MetaData:
+        md = build_static_metadata()
+        item = md.tables["core_item"]
+        item.c.name.type = item.c.id.type
+        for fk in list(item.foreign_keys):
+            item.c[fk.parent.name].foreign_keys.discard(fk)
+            item.foreign_keys.discard(fk)
+        return md
+
+    monkeypatch.setattr(static, "build_static_metadata", drifted)
+    diffs = compare_with_reflection(sync_conn)
+    assert any(d.startswith("core_item.name:") for d in diffs)
+    assert any(d.startswith("core_item: fks") for d in diffs)
@@ -0,0 +1,65 @@
+# src/fastapi_app/tests/test_notify.py
+"""
+LISTEN/NOTIFY инвалидация маппинга (asyncdb/notify.py): pg_notify на канал пересобирает маппинг,
+оборванное LISTEN-соединение переподключается и слушает дальше.
+"""
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+from ..asyncdb import notify
+
+# Свой канал: уведомления теста не трогают запущенные воркеры
+CHANNEL = f"test_refresh_mapping_{os.getpid()}"
+
+_LISTENER_PID_SQL = "SELECT pid FROM pg_stat_activity WHERE query = $1 AND pid <> pg_backend_pid()"
+
+
+class Refreshes:
+    """ Вместо refresh_mapping: считает вызовы """
+
+    def __init__(self):
+        self.calls = 0
+        self._changed = asyncio.Condition()
+
+    async def __call__(self, force: bool = False) -> None:
+        async with self._changed:
+            self.calls += 1
+            self._changed.notify_all()
+
+    async def wait(self, calls: int, timeout: float = 5.0) -> None:
+        async with self._changed:
+            await asyncio.wait_for(self._changed.wait_for(lambda: self.calls >= calls), timeout)
+
+
+async def _scenario(monkeypatch) -> None:
+    refreshes = Refreshes()
+    monkeypatch.setattr(notify, "refresh_mapping", refreshes)
+    listener = asyncio.create_task(notify.listen_mapping_changes(CHANNEL))
+    conn = await asyncpg.connect(notify._listen_dsn())
+    try:
+        # после подключения — сверка сигнатуры
+        await refreshes.wait(1)
+        await conn.execute("SELECT pg_notify($1, 'migrate')", CHANNEL)
+        await refreshes.wait(2)
+
+        pids = await conn.fetch(_LISTENER_PID_SQL, f'LISTEN "{CHANNEL}"')
+        assert len(pids) == 1
+        await conn.execute("SELECT pg_terminate_backend($1)", pids[0]["pid"])
+
+        # переподключение (через backoff) снова сверяет сигнатуру и слушает канал
+        await refreshes.wait(3)
+        await conn.execute("SELECT pg_notify($1, 'migrate')", CHANNEL)
+        await refreshes.wait(4)
+        assert len(await conn.fetch(_LISTENER_PID_SQL, f'LISTEN "{CHANNEL}"')) == 1
+    finally:
+        await conn.close()
+        listener.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await listener
+
+
+def test_notify_refreshes_mapping_and_survives_reconnect(sync_conn, monkeypatch):
+    asyncio.run(_scenario(monkeypatch))
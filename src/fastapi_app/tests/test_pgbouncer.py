@@ -0,0 +1,71 @@
+# src/fastapi_app/tests/test_pgbouncer.py
+"""
+FASTAPI_DB_PGBOUNCER=true: prepared statements не переживают транзакцию — соседние транзакции
+в transaction pooling попадают на разные backend'ы.
+
+FASTAPI_TEST_PGBOUNCER_URL (postgresql+asyncpg://...) — настоящий PgBouncer в transaction mode
+(сервис pgbouncer в docker-compose.yml, профиль pgbouncer). Без него — стенд на прямом
+соединении: DEALLOCATE ALL при каждом возврате соединения в пул, то есть следующая транзакция
+видит backend без prepared statements этого клиента.
+"""
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import event
+
+import fastapi_app.routes.items  # noqa: F401  (регистрирует statement'ы items.*)
+
+from ..asyncdb import engine as engine_module
+from ..asyncdb.auto import get_statement, refresh_mapping
+from ..asyncdb.engine import SessionLocal, create_pooled_engine, fetch_records
+from ..settings.config import settings
+
+PGBOUNCER_URL = os.getenv("FASTAPI_TEST_PGBOUNCER_URL", "")
+
+
+def _deallocate_on_checkin(async_engine) -> None:
+    @event.listens_for(async_engine.sync_engine, "checkin")
+    def _switch_backend(dbapi_connection, connection_record):
+        if dbapi_connection is not None:
+            dbapi_connection.await_(dbapi_connection._connection.execute("DEALLOCATE ALL"))
+
+
+def _bouncer_engine(pgbouncer: bool, monkeypatch):
+    monkeypatch.setattr(settings, "db_pgbouncer", pgbouncer)
+    async_engine = create_pooled_engine(PGBOUNCER_URL or engine_module.ASYNC_DATABASE_URL,
+                                        pool_size=4, max_overflow=0)
+    if not PGBOUNCER_URL:
+        _deallocate_on_checkin(async_engine)
+    return async_engine
+
+
+async def _transaction(async_engine) -> None:
+    """ Одна транзакция: statement через SQLAlchemy и он же через raw fast path (asyncpg) """
+    stmt = get_statement("items.list")
+    async with SessionLocal(bind=async_engine) as session:
+        rows = (await session.execute(stmt, {"limit": 5})).mappings().all()
+        records = await fetch_records(session, stmt, {"limit": 5})
+    assert [r["id"] for r in rows] == [r["id"] for r in records]
+
+
+async def _workload(async_engine, sequential: int = 10, concurrent: int = 20) -> None:
+    try:
+        await refresh_mapping(force=True)
+        for _ in range(sequential):
+            await _transaction(async_engine)
+        await asyncio.gather(*(_transaction(async_engine) for _ in range(concurrent)))
+    finally:
+        await async_engine.dispose()
+        await engine_module.engine.dispose()  # пул primary привязан к event loop этого теста
+
+
+def test_pgbouncer_mode_survives_transaction_pooling(sync_conn, monkeypatch):
+    asyncio.run(_workload(_bouncer_engine(True, monkeypatch)))
+
+
+@pytest.mark.skipif(bool(PGBOUNCER_URL), reason="with a real PgBouncer the failure depends on backend assignment")
+def test_statement_cache_breaks_without_pgbouncer_mode(sync_conn, monkeypatch):
+    """ Контроль стенда: кэш prepared statements по умолчанию ломается на смене backend'а """
+    with pytest.raises(Exception, match=r'prepared statement "\S+" does not exist'):
+        asyncio.run(_workload(_bouncer_engine(False, monkeypatch)))
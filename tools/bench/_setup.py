@@ -0,0 +1,39 @@
+# tools/bench/_setup.py
+"""
+Общая обвязка бенчмарков tools/bench: src/ в sys.path, инициализация Django, замеры.
+Нужны те же ENV, что у приложения (POSTGRES_*, SECRET_KEY, ALLOWED_HOSTS, ...).
+"""
+import os
+import statistics
+import sys
+import time
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+
+def setup_django() -> None:
+    if SRC not in sys.path:
+        sys.path.insert(0, SRC)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.settings")
+    import django
+    django.setup()
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    """ Лучшее время fn() из repeat запусков, сек """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def median_of(fn, repeat: int = 5) -> float:
+    """ Медиана времени fn() из repeat запусков, сек """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
@@ -0,0 +1,87 @@
+# tools/bench/batch_tasks.py
+"""
+Пропускная способность Celery — задача на элемент против BatchTask (пачка на сообщение),
+с результатами и без. Брокер memory://, solo-воркер в этом же процессе, тело задачи пустое:
+меряется накладная стоимость сообщений и записи результатов (бэкенд — CELERY_RESULT_STORE).
+
+    python tools/bench/batch_tasks.py single 5000 [--store-results]
+    python tools/bench/batch_tasks.py batch 1000000 [--size 500] [--store-results]
+"""
+import argparse
+import os
+import threading
+import time
+
+os.environ.setdefault("CELERY_BROKER_URL", "memory://")
+
+from _setup import setup_django  # noqa: E402
+
+setup_django()
+
+from celery.contrib.testing.worker import start_worker  # noqa: E402
+from django.db import connection  # noqa: E402
+from django_celery_results.models import TaskResult  # noqa: E402
+
+from apps.core.batching import BatchTask  # noqa: E402
+from django_project.celery import app  # noqa: E402
+
+
+class Counter:
+    def __init__(self, target: int):
+        self.target = target
+        self.done = 0
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.done += n
+            if self.done >= self.target:
+                self.finished.set()
+
+
+def result_rows() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {TaskResult._meta.db_table}")
+        return cursor.fetchone()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=("single", "batch"))
+    parser.add_argument("items", type=int)
+    parser.add_argument("--size", type=int, default=500, help="элементов в пачке (batch)")
+    parser.add_argument("--store-results", action="store_true", help="ignore_result=False у задач")
+    args = parser.parse_args()
+
+    counter = Counter(args.items)
+    ignore_result = not args.store_results
+
+    @app.task(name="bench.noop", ignore_result=ignore_result)
+    def noop(item):
+        counter.add(1)
+
+    @app.task(name="bench.noop_batch", base=BatchTask, batch_size=args.size, ignore_result=ignore_result)
+    def noop_batch(items):
+        counter.add(len(items))
+
+    before = result_rows()
+    with start_worker(app, pool="solo", perform_ping_check=False, loglevel="WARNING", shutdown_timeout=30):
+        started = time.perf_counter()
+        if args.mode == "batch":
+            for i in range(args.items):
+                noop_batch.push(i)
+            noop_batch.flush()
+        else:
+            for i in range(args.items):
+                noop.delay(i)
+        enqueued = time.perf_counter() - started
+        counter.finished.wait(600)
+        total = time.perf_counter() - started
+    print(f"{args.mode:6s} items={args.items:8d} results={'stored' if args.store_results else 'ignored':7s}"
+          f"  enqueue {enqueued:6.2f} s  total {total:6.2f} s  {counter.done / total:9.0f} items/s"
+          f"  result rows +{result_rows() - before}")
+
+
+if __name__ == "__main__":
+    main()
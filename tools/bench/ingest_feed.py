@@ -0,0 +1,89 @@
+# tools/bench/ingest_feed.py
+"""
+Загрузка фида через COPY staging + set-wise SQL (apps/core/ingest.py, путь FastAPI).
+Три прогона одного набора external_id: свежая загрузка, тот же фид без изменений,
+фид с переименованной каждой 10-й позицией. Пишет в БД: items и справочники
+с префиксом --prefix удаляются до и после прогона (--keep — оставить).
+
+    python tools/bench/ingest_feed.py [--items 100000] [--prefix bench-ingest]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from _setup import setup_django
+
+setup_django()
+
+import orjson  # noqa: E402
+
+from apps.core.ingest import ingest_async, parse  # noqa: E402
+from apps.core.models import Category, Item, ItemTag, Supplier, Tag  # noqa: E402
+from fastapi_app.asyncdb.engine import engine  # noqa: E402
+
+CATEGORIES = 3
+TAGS = 5
+
+
+def make_feed(items: int, prefix: str, renamed_every: int = 0) -> bytes:
+    rnd = random.Random(1)
+    lines = []
+    for i in range(items):
+        renamed = renamed_every and i % renamed_every == 0
+        lines.append(orjson.dumps({
+            "external_id": f"{prefix}-{i}",
+            "name": f"{prefix} item {i}" + (" v2" if renamed else ""),
+            "supplier": f"{prefix} supplier {i % 50}",
+            "categories": [f"{prefix} category {k}" for k in rnd.sample(range(30), CATEGORIES)],
+            "tags": [{"title": f"{prefix} tag {k}", "weight": rnd.randint(0, 9)}
+                     for k in rnd.sample(range(100), TAGS)],
+        }))
+    return b"\n".join(lines)
+
+
+async def run(label: str, feed: bytes, items: int) -> None:
+    started = time.perf_counter()
+    batch = parse(feed, "ndjson")
+    parsed = time.perf_counter() - started
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        result = await ingest_async(raw.driver_connection, batch)
+    elapsed = time.perf_counter() - started
+    staged = items * (1 + CATEGORIES + TAGS)
+    print(f"{label:16s} {elapsed:6.2f} s (parse {parsed:4.2f} s)  {items / elapsed:8.0f} items/s"
+          f"  {staged / elapsed:8.0f} staged rows/s  created={result['items_created']}"
+          f" updated={result['items_updated']}")
+
+
+def cleanup(prefix: str) -> None:
+    items = Item.objects.filter(external_id__startswith=f"{prefix}-")
+    ItemTag.objects.filter(item__in=items)._raw_delete(ItemTag.objects.db)
+    Item.categories.through.objects.filter(item__in=items)._raw_delete(Item.objects.db)
+    items._raw_delete(Item.objects.db)
+    Supplier.objects.filter(name__startswith=f"{prefix} ").delete()
+    Category.objects.filter(title__startswith=f"{prefix} ").delete()
+    Tag.objects.filter(title__startswith=f"{prefix} ").delete()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--prefix", default="bench-ingest")
+    parser.add_argument("--keep", action="store_true", help="не удалять загруженные items")
+    args = parser.parse_args()
+
+    await asyncio.to_thread(cleanup, args.prefix)
+    feed = make_feed(args.items, args.prefix)
+    try:
+        await run("fresh load", feed, args.items)
+        await run("unchanged feed", feed, args.items)
+        await run("10% renamed", make_feed(args.items, args.prefix, renamed_every=10), args.items)
+    finally:
+        if not args.keep:
+            await asyncio.to_thread(cleanup, args.prefix)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+# tools/bench/item_facets.py
+"""
+GET /demo/items/facets — страница items + счётчики supplier / category / tag одним запросом.
+Медиана некэшированных запросов через приложение для типовых наборов фильтров.
+"Первое" значение — наименьший id, "типичное" — значение с медианным числом связей.
+
+    python tools/bench/item_facets.py [--repeat 5]
+"""
+import argparse
+import os
+
+os.environ["FASTAPI_REDIS_URL"] = ""  # без кэша ответов — меряем сам запрос
+
+from _setup import median_of, setup_django  # noqa: E402
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from fastapi_app.main import app  # noqa: E402
+
+# значение измерения с медианным числом связей
+_TYPICAL_SQL = """
+SELECT {col} FROM (
+    SELECT {col}, count(*) AS n FROM {table} GROUP BY {col}
+) t ORDER BY n LIMIT 1 OFFSET (SELECT count(DISTINCT {col}) / 2 FROM {table})
+"""
+
+
+def _scalar(sql: str):
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+
+def build_cases() -> dict:
+    s0 = _scalar("SELECT min(id) FROM core_supplier")
+    c0 = _scalar("SELECT min(category_id) FROM core_item_categories")
+    t0 = _scalar("SELECT min(tag_id) FROM core_item_tag")
+    c = _scalar(_TYPICAL_SQL.format(col="category_id", table="core_item_categories"))
+    t = _scalar(_TYPICAL_SQL.format(col="tag_id", table="core_item_tag"))
+    return {
+        "no filters": {},
+        "supplier=first": {"supplier": [s0]},
+        "category=typical": {"category": [c]},
+        "tag=typical": {"tag": [t]},
+        "category=first OR typical": {"category": [c0, c]},
+        "supplier*2+category+tag": {"supplier": [s0, s0 + 1], "category": [c], "tag": [t]},
+        "category=first": {"category": [c0]},
+        "category=first+tag=first": {"category": [c0], "tag": [t0]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = build_cases()
+    with TestClient(app) as client:
+        for label, params in cases.items():
+            def request():
+                response = client.get("/api/demo/items/facets", params=params)
+                response.raise_for_status()
+                return response
+
+            body = request().json()  # прогрев
+            elapsed = median_of(request, args.repeat)
+            print(f"{label:28s} {elapsed * 1000:8.1f} ms  items={len(body['items'])}"
+                  f"  facets={[len(v) for v in body['facets'].values()]}  {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# tools/bench/item_search.py
+"""
+Поиск по core_item.name — прежний ILIKE '%q%' (seq scan) против full-text по
+GIN-индексу search_vector; при установленном pg_trgm — ещё trigram-ветка и полный запрос
+search_items() (FTS ИЛИ word similarity, как в ItemAdmin и /demo/items/search).
+
+    python tools/bench/item_search.py [--word WORD] [--repeat 5]
+"""
+import argparse
+
+from _setup import median_of, setup_django
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+
+from apps.core.models import Item  # noqa: E402
+from apps.core.search import SEARCH_CONFIG, prefix_tsquery, search_items  # noqa: E402
+
+FTS = f"search_vector @@ to_tsquery('{SEARCH_CONFIG}', %s)"
+QUERIES = {
+    "ILIKE page (old admin, LIMIT 100)":
+        "SELECT id, name FROM core_item WHERE name ILIKE %s ORDER BY created_at DESC, id DESC LIMIT 100",
+    "ILIKE count (old admin paginator)":
+        "SELECT count(*) FROM core_item WHERE name ILIKE %s",
+    "FTS prefix ranked page (LIMIT 20)":
+        f"SELECT id, name, ts_rank(search_vector, to_tsquery('{SEARCH_CONFIG}', %s))::float8 AS r "
+        f"FROM core_item WHERE {FTS} ORDER BY r DESC, id DESC LIMIT 20",
+    "FTS count":
+        f"SELECT count(*) FROM core_item WHERE {FTS}",
+    "trigram word similarity page (LIMIT 20)":
+        "SELECT id, name FROM core_item WHERE %s <%% name ORDER BY word_similarity(%s, name) DESC LIMIT 20",
+}
+
+
+def default_word() -> str:
+    """ Самое длинное слово из названия последнего item'а """
+    name = Item.objects.order_by("-id").values_list("name", flat=True).first() or "item"
+    return max(name.split(), key=len)
+
+
+def params_for(label: str, word: str) -> list:
+    if label.startswith("ILIKE"):
+        return [f"%{word}%"]
+    if label.startswith("FTS prefix"):
+        return [prefix_tsquery(word)] * 2
+    if label.startswith("FTS"):
+        return [prefix_tsquery(word)]
+    return [word, word]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--word")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    word = args.word or default_word()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM core_item")
+        total = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT FROM pg_extension WHERE extname = 'pg_trgm')")
+        trigram = cursor.fetchone()[0]
+        print(f"core_item rows: {total}, word: {word!r}, pg_trgm: {trigram}")
+
+        for label, sql in QUERIES.items():
+            if label.startswith("trigram") and not trigram:
+                print(f"{label:42s}     skipped (no pg_trgm)")
+                continue
+            params = params_for(label, word)
+
+            def run():
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+            rows = run()  # прогрев
+            print(f"{label:42s} {median_of(run, args.repeat) * 1000:8.2f} ms  rows={len(rows)}")
+
+    if trigram:
+        def orm_page():
+            return list(search_items(Item.objects.all(), word).values_list("id", flat=True)[:20])
+
+        orm_page()
+        print(f"{'search_items() page (FTS OR trigram)':42s} {median_of(orm_page, args.repeat) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# tools/bench/mapped_class.py
+"""
+Стоимость get_mapped_class() — индекс снимка (snap.resolve) против прежнего
+разбора target на каждом вызове (тот же снимок с пустым индексом).
+
+    python tools/bench/mapped_class.py [--number 100000]
+"""
+import argparse
+import asyncio
+import dataclasses
+import timeit
+from types import MappingProxyType
+
+from _setup import setup_django
+
+setup_django()
+
+from apps.core.models import Item  # noqa: E402
+from fastapi_app.asyncdb import auto  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    asyncio.run(auto.refresh_mapping())
+    indexed = auto.state.snapshot
+    scan = dataclasses.replace(indexed, resolve=MappingProxyType({}))
+    print(f"models in mapping: {len(indexed.class_by_table)}")
+    for target in (Item, "core.Item", "Item"):
+        per_call = {}
+        for label, snap in (("indexed", indexed), ("scan", scan)):
+            auto.state.snapshot = snap
+            per_call[label] = timeit.timeit(lambda: auto.get_mapped_class(target), number=args.number)
+        auto.state.snapshot = indexed
+        print(f"{target!s:40s} scan {per_call['scan'] / args.number * 1e6:6.2f} us"
+              f"  indexed {per_call['indexed'] / args.number * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
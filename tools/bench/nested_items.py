@@ -0,0 +1,70 @@
+# tools/bench/nested_items.py
+"""
+Keyset-обход плоских JOIN-роутов и /demo/items_nested (одна строка на item,
+M2M — jsonb_agg-подзапросами). Считает запросы, строки и разные item'ы; кэш ответов выключен.
+
+    python tools/bench/nested_items.py [--limit 200] [--items 10000] [--repeat 3]
+"""
+import argparse
+import os
+import time
+
+os.environ["FASTAPI_REDIS_URL"] = ""  # меряем БД и кодирование, не Redis
+
+from _setup import setup_django  # noqa: E402
+
+setup_django()
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from fastapi_app.main import app  # noqa: E402
+
+ROUTES = {
+    "/api/demo/items_with_supplier": "item_id",
+    "/api/demo/items_categories": "item_id",
+    "/api/demo/items_tags": "item_id",
+    "/api/demo/items_nested": "id",
+}
+
+
+def walk(client: TestClient, path: str, id_key: str, limit: int, items: int) -> tuple[int, int, int]:
+    """ Страницы по X-Next-Cursor, пока не наберётся items разных item'ов -> (запросы, строки, item'ы) """
+    requests = rows = 0
+    seen: set = set()
+    params = {"limit": limit}
+    while len(seen) < items:
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        page = response.json()
+        requests += 1
+        rows += len(page)
+        seen.update(row[id_key] for row in page)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": limit, "cursor": cursor}
+    return requests, rows, len(seen)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--items", type=int, default=10_000, help="сколько разных item'ов обойти")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        for path, id_key in ROUTES.items():
+            walk(client, path, id_key, args.limit, args.limit)  # прогрев
+            best = None
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                stats = walk(client, path, id_key, args.limit, args.items)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            requests, rows, items = stats
+            print(f"{path:32s} requests={requests:5d} rows={rows:7d} items={items:6d} {best * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# tools/bench/raw_fast_path.py
+"""
+Страница core_item (statement items.list) — выборка + JSON-кодирование:
+  orm+jsonable  session.execute -> dict -> jsonable_encoder -> JSONResponse (encoder "default")
+  orm+orjson    session.execute -> dict -> ORJSONResponse
+  raw+orjson    fetch_records (asyncpg.Record) -> ORJSONResponse (FASTAPI_RAW_FAST_PATH=1)
+
+    python tools/bench/raw_fast_path.py [--rows 10000 100000] [--repeat 3]
+"""
+import argparse
+import asyncio
+import time
+
+from _setup import setup_django
+
+setup_django()
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import fastapi_app.routes.items  # noqa: E402,F401  (регистрирует statement'ы)
+from fastapi_app.asyncdb import auto  # noqa: E402
+from fastapi_app.asyncdb.engine import SessionLocal, fetch_records  # noqa: E402
+from fastapi_app.core.responses import ORJSONResponse  # noqa: E402
+
+
+async def _orm_rows(session, stmt, params):
+    return [dict(r) for r in (await session.execute(stmt, params)).mappings()]
+
+
+async def run_variant(variant: str, stmt, rows: int) -> tuple[float, int]:
+    params = {"limit": rows}
+    async with SessionLocal() as session:
+        started = time.perf_counter()
+        if variant == "orm+jsonable":
+            body = JSONResponse(jsonable_encoder(await _orm_rows(session, stmt, params))).body
+        elif variant == "orm+orjson":
+            body = ORJSONResponse(await _orm_rows(session, stmt, params)).body
+        else:
+            body = ORJSONResponse(await fetch_records(session, stmt, params)).body
+        return time.perf_counter() - started, len(body)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    await auto.refresh_mapping()
+    stmt = auto.get_statement("items.list")
+    for rows in args.rows:
+        for variant in ("orm+jsonable", "orm+orjson", "raw+orjson"):
+            await run_variant(variant, stmt, rows)  # прогрев: prepared statement, кэш страниц
+            runs = [await run_variant(variant, stmt, rows) for _ in range(args.repeat)]
+            best, size = min(runs)
+            print(f"{rows:7d} rows  {variant:13s} {best * 1000:8.1f} ms  {size} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())